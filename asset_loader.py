@@ -0,0 +1,63 @@
+import queue
+import threading
+
+
+class AssetLoader:
+    """Runs slow loads (image decoding, font lookups, sounds) on a worker thread
+
+    Each job is a load function, run on the worker, and an apply function that
+    gets its result on the main thread from poll(). Until then the game draws
+    with placeholders, so the window is usable right away.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.results = queue.Queue()
+        self.thread = None
+        self.done = 0
+
+    def add(self, load, apply):
+        self.jobs.append((load, apply))
+
+    def start(self):
+        self.thread = threading.Thread(target=self._work, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def _work(self):
+        for load, apply in self.jobs:
+            try:
+                result = load()
+            except Exception:
+                result = None  # A broken asset just keeps its placeholder
+            self.results.put((apply, result))
+
+    @property
+    def total(self):
+        return len(self.jobs)
+
+    @property
+    def finished(self):
+        return self.done == len(self.jobs)
+
+    @property
+    def progress(self):
+        return self.done / len(self.jobs) if self.jobs else 1.0
+
+    def poll(self):
+        # Apply whatever has finished; returns True if anything changed
+        applied = False
+        while True:
+            try:
+                apply, result = self.results.get_nowait()
+            except queue.Empty:
+                return applied
+            if result is not None:
+                apply(result)
+            self.done += 1
+            applied = True
+
+    def wait(self):
+        # Block until every job has loaded and been applied (tools, tests, shutdown)
+        if self.thread is not None:
+            self.thread.join()
+        self.poll()
@@ -0,0 +1,71 @@
+import os
+import pygame
+
+ASSET_DIR = 'assets'
+PORTRAIT_SIZE = (150, 150)
+PORTRAIT_DARKEN = (0, 0, 0, 100)
+
+
+class AssetManager:
+    """Loads, scales and converts images once so draw code only blits"""
+
+    def __init__(self, screen_size, asset_dir=ASSET_DIR):
+        self.screen_size = screen_size
+        self.asset_dir = asset_dir
+        self.portraits = {}
+        self.dark_portraits = {}
+        self.overlays = {}
+
+    def load_image(self, filename, size=None):
+        # Returns a display-format surface, or None if the file can't be decoded
+        try:
+            image = pygame.image.load(os.path.join(self.asset_dir, filename))
+        except (pygame.error, FileNotFoundError):
+            return None
+        # Only keep per-pixel alpha if the source file actually has it
+        image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+        if size is not None and image.get_size() != size:
+            image = pygame.transform.smoothscale(image, size)
+        return image
+
+    def blank_background(self):
+        # Shown until the real background has loaded, or if it can't be
+        background = pygame.Surface(self.screen_size).convert()
+        background.fill((0, 0, 0))
+        return background
+
+    def load_background(self, filename):
+        # Safe to call from the loader thread; the result is assigned by the caller
+        return self.load_image(filename, self.screen_size)
+
+    def load_portrait(self, name, size=PORTRAIT_SIZE):
+        # (portrait, darkened portrait), or None if the image is missing
+        image = self.load_image(f"{name}.png", size)
+        if image is None:
+            return None
+        # Bake the "not selected" darkening into its own surface
+        dark = image.copy()
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(PORTRAIT_DARKEN)
+        dark.blit(overlay, (0, 0))
+        return image, dark
+
+    def add_portrait(self, name, images):
+        self.portraits[name], self.dark_portraits[name] = images
+
+    def get_portrait(self, name, selected=True):
+        # None means the portrait is missing and a placeholder should be drawn
+        if selected:
+            return self.portraits.get(name)
+        return self.dark_portraits.get(name)
+
+    def get_overlay(self, size, color, alpha):
+        # Flat translucent fills (e.g. screen dimming) are built once per key
+        key = (size, color, alpha)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(size).convert()
+            overlay.fill(color)
+            overlay.set_alpha(alpha)
+            self.overlays[key] = overlay
+        return overlay
@@ -0,0 +1,226 @@
+"""Monte Carlo combat simulator for CharacterClass / MonsterType balancing.
+
+Fights are simulated as NumPy arrays, one element per fight, using the same
+damage rules as Simulation.execute_combat_action and handle_monster_turn.
+Turns follow SPD as in initiative.Initiative: each side waits
+TURN_LENGTH // SPD between turns and the player opens. Only one-on-one
+fights on base stats are modelled: status effects other than Defend's
+guard, monster abilities and packs are left out.
+Run as a script to sweep class stat multipliers over a process pool:
+
+    python balance.py --fights 200000 --levels 1-8 --scales 0.9,1.0,1.1 --out balance.csv
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from initiative import TURN_LENGTH
+from simulation import (CharacterClass, CLASS_INFO, CLASS_SPECIALS, DEFEND_EFFECT,
+                        MONSTER_KINDS, monster_choices)
+
+ACTIONS = ("Attack", "Defend", "Special")
+ATTACK, DEFEND, SPECIAL = range(3)
+POLICIES = ("attack", "special", "random")
+MAX_TURNS = 500  # Player turns before a fight counts as a timeout
+MAX_SPIRIT = 100
+
+CSV_FIELDS = ["class", "hp_scale", "atk_scale", "def_scale", "player_level", "fight",
+              "monster", "monster_level", "fights", "win_rate", "mean_turns",
+              "mean_hp_left", "timeout_rate"]
+
+
+def player_stats(char_class, level, hp_scale=1.0, atk_scale=1.0, def_scale=1.0):
+    # Mirrors the class stat block plus check_level_up gains
+    info = CLASS_INFO[char_class]
+    max_hp = int(round(info.hp * hp_scale)) + 10 * (level - 1)
+    atk = int(round(info.atk * atk_scale)) + 2 * (level - 1)
+    defense = int(round(info.def_ * def_scale)) + (level - 1)
+    return max_hp, atk, defense, info.spd
+
+
+def monster_stats(monster_type, level):
+    # Mirrors Monster.__init__ for a fixed type
+    kind = MONSTER_KINDS[monster_type]
+    hp = int((50 + level * 10) * kind.hp_mult)
+    atk = int((5 + level * 2) * kind.atk_mult)
+    defense = int((3 + level) * kind.def_mult)
+    return hp, atk, defense, 4 + level
+
+
+def simulate_fights(player, monster, fights, policy="special", hp_min=1.0, rng=None,
+                    special=CLASS_SPECIALS[CharacterClass.WARRIOR]):
+    """Run `fights` independent fights at once and return per-fight arrays
+
+    player and monster are (max_hp, atk, def, spd) tuples, special the player's
+    CLASS_SPECIALS entry (its effects are ignored). Starting HP is drawn
+    uniformly from [hp_min * max_hp, max_hp] and starting spirit from
+    [0, 100] when hp_min < 1, modelling a hero who arrives already worn down.
+    Returns (won, turns, hp_left) arrays; fights still running after
+    MAX_TURNS count as neither won nor lost.
+    """
+    rng = rng or np.random.default_rng()
+    max_hp, p_atk, p_def, p_spd = player
+    m_hp0, m_atk, m_def, m_spd = monster
+
+    if hp_min < 1.0:
+        low = max(1, int(max_hp * hp_min))
+        hp = rng.integers(low, max_hp + 1, size=fights, dtype=np.int32)
+        spirit = rng.integers(0, MAX_SPIRIT + 1, size=fights, dtype=np.int32)
+    else:
+        hp = np.full(fights, max_hp, dtype=np.int32)
+        spirit = np.full(fights, MAX_SPIRIT, dtype=np.int32)
+    m_hp = np.full(fights, m_hp0, dtype=np.int32)
+    turns = np.zeros(fights, dtype=np.int32)
+    won = np.zeros(fights, dtype=bool)
+    active = np.ones(fights, dtype=bool)
+    guard = np.zeros(fights, dtype=bool)  # Defended, until the player's next turn
+
+    # Initiative per fight, as in initiative.Initiative: each side's next turn
+    # time; on a tie whoever was queued first goes first
+    p_wait = max(1, TURN_LENGTH // max(1, p_spd))
+    m_wait = max(1, TURN_LENGTH // max(1, m_spd))
+    p_time = np.zeros(fights, dtype=np.int64)
+    m_time = np.full(fights, m_wait, dtype=np.int64)
+    player_last = np.zeros(fights, dtype=bool)  # The player's turn was queued after the monster's
+
+    attack_damage = max(1, p_atk - m_def)
+    special_cost, hits, multiplier, _ = special
+    special_damage = hits * int(p_atk * multiplier)
+
+    while True:
+        fighting = np.flatnonzero(active)
+        if not len(fighting):
+            break
+        player_due = ((p_time[fighting] < m_time[fighting])
+                      | ((p_time[fighting] == m_time[fighting]) & ~player_last[fighting]))
+
+        # Player's turn in the fights where it's due
+        idx = fighting[player_due]
+        p_time[idx] += p_wait
+        # The opening turn is requeued before the monster joins the battle
+        player_last[idx] = turns[idx] > 0
+        guard[idx] = False
+        if policy == "attack":
+            action = np.full(len(idx), ATTACK)
+        elif policy == "special":
+            action = np.where(spirit[idx] >= special_cost, SPECIAL, ATTACK)
+        else:
+            action = rng.integers(0, len(ACTIONS), size=len(idx))
+        # Special without enough spirit does nothing, as in the game
+        use_special = (action == SPECIAL) & (spirit[idx] >= special_cost)
+        defend = action == DEFEND
+        guard[idx] = defend
+
+        damage = np.where(action == ATTACK, attack_damage, 0)
+        damage = np.where(use_special, special_damage, damage)
+        m_hp[idx] -= damage
+        spirit[idx] -= np.where(use_special, special_cost, 0)
+        hp[idx] += np.where(defend, np.minimum(10, max_hp - hp[idx]), 0)
+        turns[idx] += 1
+
+        killed = m_hp[idx] <= 0
+        won[idx[killed]] = True
+        active[idx[killed]] = False
+        active[idx[turns[idx] >= MAX_TURNS]] = False
+
+        # Monster's turn in the others
+        hit_idx = fighting[~player_due]
+        m_time[hit_idx] += m_wait
+        player_last[hit_idx] = False
+        defense = p_def + np.where(guard[hit_idx], DEFEND_EFFECT[1], 0)
+        hp[hit_idx] -= np.maximum(1, m_atk - defense)
+        active[hit_idx[hp[hit_idx] <= 0]] = False
+
+    return won, turns, np.maximum(hp, 0)
+
+
+def summarize(won, turns, hp_left):
+    fights = len(won)
+    wins = int(won.sum())
+    timeouts = int((~won & (hp_left > 0)).sum())
+    return {
+        "fights": fights,
+        "win_rate": wins / fights,
+        "mean_turns": float(turns[won].mean()) if wins else float("nan"),
+        "mean_hp_left": float(hp_left[won].mean()) if wins else 0.0,
+        "timeout_rate": timeouts / fights,
+    }
+
+
+def sweep_class(task):
+    # One process-pool task: every level and monster for one class stat block
+    class_name, hp_scale, atk_scale, def_scale, levels, fights, policy, hp_min, seed = task
+    char_class = CharacterClass[class_name]
+    rng = np.random.default_rng(seed)
+    rows = []
+    for level in levels:
+        player = player_stats(char_class, level, hp_scale, atk_scale, def_scale)
+        for fight, monster_level in (("normal", level), ("boss", level + 5)):
+            for monster_type in monster_choices(monster_level):
+                result = simulate_fights(player, monster_stats(monster_type, monster_level),
+                                         fights, policy, hp_min, rng, CLASS_SPECIALS[char_class])
+                row = {
+                    "class": class_name,
+                    "hp_scale": hp_scale,
+                    "atk_scale": atk_scale,
+                    "def_scale": def_scale,
+                    "player_level": level,
+                    "fight": fight,
+                    "monster": monster_type.name,
+                    "monster_level": monster_level,
+                }
+                row.update(summarize(*result))
+                rows.append(row)
+    return rows
+
+
+def parse_levels(text):
+    if "-" in text:
+        low, high = text.split("-")
+        return list(range(int(low), int(high) + 1))
+    return [int(level) for level in text.split(",")]
+
+
+def parse_scales(text):
+    return [float(scale) for scale in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep class stats against every monster")
+    parser.add_argument("--fights", type=int, default=100000, help="fights per matchup")
+    parser.add_argument("--levels", type=parse_levels, default=parse_levels("1-8"),
+                        help="player levels, e.g. 1-8 or 1,3,5")
+    parser.add_argument("--scales", type=parse_scales, default=[1.0],
+                        help="comma-separated multipliers applied to HP, ATK and DEF")
+    parser.add_argument("--classes", default=",".join(c.name for c in CharacterClass),
+                        help="comma-separated class names")
+    parser.add_argument("--policy", choices=POLICIES, default="special")
+    parser.add_argument("--hp-min", type=float, default=1.0,
+                        help="lowest starting HP fraction (1.0 = always full HP)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default="-", help="CSV path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    seeds = np.random.SeedSequence(args.seed)
+    grid = list(itertools.product(args.classes.split(","), args.scales, args.scales, args.scales))
+    tasks = [(class_name, hp, atk, def_, args.levels, args.fights, args.policy, args.hp_min, child)
+             for (class_name, hp, atk, def_), child in zip(grid, seeds.spawn(len(grid)))]
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    try:
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for rows in pool.map(sweep_class, tasks):
+                writer.writerows(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Memory and attribute-access benchmark for the game's per-entity objects.
+
+Compares the slotted Monster, PlayerStats and array-backed board against
+the dict-backed layouts they replaced, which are rebuilt here as the
+baseline: monsters that copy their type's strings into an instance dict,
+string-keyed player stats and one Tile object per board cell. Memory is
+measured with tracemalloc, lookups with timeit.
+
+    python benchmark.py --monsters 100000 --board 512
+"""
+import argparse
+import random
+import timeit
+import tracemalloc
+from board import GameBoard, TileType
+from simulation import CharacterClass, Monster, MonsterType, PlayerStats
+
+
+class _DictMonster:
+    # The old Monster: every instance carries its own copy of the type data
+    def __init__(self, level, monster_type):
+        self.level = level
+        self.type = monster_type
+        self.name = monster_type.value[0]
+        self.emoji = monster_type.value[1]
+        self.hp = int((50 + level * 10) * monster_type.value[2])
+        self.max_hp = self.hp
+        self.atk = int((5 + level * 2) * monster_type.value[3])
+        self.def_ = int((3 + level) * monster_type.value[4])
+        self.special_ability = monster_type.value[5]
+        self.exp_reward = 20 + level * 10
+        self.spd = 4 + level
+
+
+class _DictTile:
+    # The old Tile: one object per cell in nested lists
+    def __init__(self, tile_type):
+        self.type = tile_type
+        self.revealed = False
+        self.char = ''
+
+
+def _dict_stats(name, class_name):
+    stats = CharacterClass[class_name].value[3]
+    return {'name': name, 'class': class_name, 'level': 1, 'exp': 0,
+            'hp': stats['HP'], 'max_hp': stats['HP'], 'atk': stats['ATK'], 'def': stats['DEF'],
+            'spd': stats['SPD'], 'spirit': 100, 'max_spirit': 100}
+
+
+def measure(build):
+    # Bytes allocated by build() and still held by what it returns
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def monster_memory(count):
+    types = [random.Random(i).choice(list(MonsterType)) for i in range(64)]
+    old = measure(lambda: [_DictMonster(5, types[i % 64]) for i in range(count)])
+    new = measure(lambda: [Monster(5, monster_type=types[i % 64]) for i in range(count)])
+    return old, new
+
+
+def board_memory(size):
+    def old_board():
+        return [[_DictTile(TileType.EMPTY) for _ in range(size)] for _ in range(size)]
+    old = measure(old_board)
+    new = measure(lambda: GameBoard(size, seed=1))
+    return old, new
+
+
+def lookup_times(repeat):
+    # One combat-style read-modify-write of HP, in ns
+    old = _dict_stats("bench", "WARRIOR")
+    new = PlayerStats("bench", "WARRIOR")
+    old_time = min(timeit.repeat("stats['hp'] = min(stats['max_hp'], stats['hp'] + stats['def'])",
+                                 globals={'stats': old}, number=repeat, repeat=5))
+    new_time = min(timeit.repeat("stats.hp = min(stats.max_hp, stats.hp + stats.def_)",
+                                 globals={'stats': new}, number=repeat, repeat=5))
+    return old_time / repeat * 1e9, new_time / repeat * 1e9
+
+
+def report(label, old, new, unit):
+    print(f"{label:<28}{old:>14,.1f}{new:>14,.1f}  {unit:<6}{old / new:>7.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare entity layouts against the old dict-backed ones")
+    parser.add_argument("--monsters", type=int, default=100000, help="monsters in the big battle")
+    parser.add_argument("--board", type=int, default=512, help="board width and height")
+    parser.add_argument("--repeat", type=int, default=1000000, help="stat updates timed")
+    args = parser.parse_args(argv)
+
+    print(f"{'':<28}{'old':>14}{'new':>14}  {'':<6}{'factor':>8}")
+    old, new = monster_memory(args.monsters)
+    report(f"{args.monsters:,} monsters", old / 2 ** 20, new / 2 ** 20, "MiB")
+    report("  per monster", old / args.monsters, new / args.monsters, "B")
+    old, new = board_memory(args.board)
+    report(f"{args.board}x{args.board} board", old / 2 ** 20, new / 2 ** 20, "MiB")
+    report("player stat update", *lookup_times(args.repeat), "ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+from enum import Enum
+import numpy as np
+import fov
+import hexgrid
+
+GRID_SIZE = 9
+LIGHT_RADIUS = 2  # How far the player sees, in hex steps
+
+# Bump whenever generate_board changes what a given seed produces, so cached
+# boards from an older generator are never handed out
+GENERATOR_VERSION = 3
+
+BOSS_MIN_STEPS = 3       # Walking distance from the start to the boss room
+TREASURE_ROOMS = 3       # Guaranteed treasure rooms per board
+MAX_LAYOUT_ATTEMPTS = 8  # Layouts tried before settling for what can be reached
+
+# Bits of GameBoard.flags
+REVEALED = 1  # Seen at some point; stays on the map
+VISIBLE = 2   # In the player's field of view right now
+VISITED = 4   # The player has stood here
+
+
+class TileType(Enum):
+    EMPTY = 1
+    MONSTER = 2
+    TREASURE = 3
+    STORY = 4
+    WALL = 5
+    BOSS_ROOM = 6
+    STAIRS_DOWN = 7
+    STAIRS_UP = 8
+
+
+# Lookup tables indexed by the uint8 codes stored in the board arrays
+TILE_TYPES = [None] + list(TileType)  # code -> TileType (codes are the enum values)
+CHARS = ('', '#', '$', '?', 'B', '>', '<')  # char index -> display char
+TYPE_CHAR = np.zeros(len(TILE_TYPES), dtype=np.uint8)  # type code -> char index
+TYPE_CHAR[TileType.WALL.value] = 1
+TYPE_CHAR[TileType.TREASURE.value] = 2
+TYPE_CHAR[TileType.STORY.value] = 3
+TYPE_CHAR[TileType.BOSS_ROOM.value] = 4
+TYPE_CHAR[TileType.STAIRS_DOWN.value] = 5
+TYPE_CHAR[TileType.STAIRS_UP.value] = 6
+
+# Probability bands for random interior tiles
+TILE_BANDS = np.array([0.65, 0.80, 0.90], dtype=np.float32)
+BAND_TYPES = np.array([TileType.EMPTY.value, TileType.MONSTER.value,
+                       TileType.TREASURE.value, TileType.STORY.value], dtype=np.uint8)
+
+
+class Tile:
+    """Thin view of one board cell, backed by the board arrays"""
+    __slots__ = ('board', 'x', 'y')
+
+    def __init__(self, board, x, y):
+        self.board = board
+        self.x = x
+        self.y = y
+
+    @property
+    def type(self):
+        return TILE_TYPES[self.board.types[self.y, self.x]]
+
+    @property
+    def revealed(self):
+        return bool(self.board.flags[self.y, self.x] & REVEALED)
+
+    @revealed.setter
+    def revealed(self, value):
+        if value:
+            self.board.flags[self.y, self.x] |= REVEALED
+        else:
+            self.board.flags[self.y, self.x] &= ~np.uint8(REVEALED)
+        self.board.revision += 1
+
+    @property
+    def char(self):
+        return CHARS[self.board.chars[self.y, self.x]]
+
+
+class _GridRow:
+    __slots__ = ('board', 'y')
+
+    def __init__(self, board, y):
+        self.board = board
+        self.y = y
+
+    def __len__(self):
+        return self.board.width
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.board.width:
+            raise IndexError(x)
+        return Tile(self.board, x, self.y)
+
+
+class _GridView:
+    # Keeps grid[y][x] working for callers written against the old nested lists
+    __slots__ = ('board',)
+
+    def __init__(self, board):
+        self.board = board
+
+    def __len__(self):
+        return self.board.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.board.height:
+            raise IndexError(y)
+        return _GridRow(self.board, y)
+
+
+class GameBoard:
+    def __init__(self, width=GRID_SIZE, height=None, seed=None, generate=True):
+        self.width = width
+        self.height = width if height is None else height
+        self.seed = seed
+        self.types = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.flags = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.chars = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.grid = _GridView(self)
+        self.player_pos = (self.width // 2, self.height // 2)  # Center of the grid
+        self.boss_pos = None
+        self.stairs_pos = None  # Stairs down, on floors above the bottom (see floors.py)
+        self.dirty_tiles = set()  # Tiles the renderer still has to repaint
+        self.revision = 0  # Bumped on every tile change, so caches know to rebuild
+        self.rng = np.random.default_rng(seed)
+        self.light_radius = LIGHT_RADIUS
+        self.visible = np.zeros(0, dtype=np.int64)  # Flat indices with the VISIBLE bit set
+        self._neighbors = None
+        self._opaque = None
+        if generate:
+            self.generate_board()
+
+    @classmethod
+    def from_arrays(cls, types, chars, flags, player_pos, boss_pos, seed=None):
+        # Rebuild a board without generating, e.g. from the on-disk cache
+        height, width = types.shape
+        board = cls(width, height, seed=seed, generate=False)
+        board.types[:] = types
+        board.chars[:] = chars
+        board.flags[:] = flags
+        board.player_pos = tuple(int(v) for v in player_pos)
+        board.boss_pos = None if boss_pos is None else tuple(int(v) for v in boss_pos)
+        board.visible = np.flatnonzero(board.flags.ravel() & VISIBLE)
+        stairs = np.flatnonzero(board.types.ravel() == TileType.STAIRS_DOWN.value)
+        if len(stairs):
+            board.stairs_pos = (int(stairs[0] % width), int(stairs[0] // width))
+        return board
+
+    def set_tile(self, x, y, tile_type, revealed=False):
+        self.types[y, x] = tile_type.value
+        self.chars[y, x] = TYPE_CHAR[tile_type.value]
+        self.flags[y, x] = REVEALED if revealed else 0
+        self._opaque = None
+        self.revision += 1
+
+    def replace_tile(self, x, y, tile_type):
+        # Like set_tile, but keeps what the player has seen of it
+        self.types[y, x] = tile_type.value
+        self.chars[y, x] = TYPE_CHAR[tile_type.value]
+        self.dirty_tiles.add((x, y))
+        self._opaque = None
+        self.revision += 1
+
+    def generate_board(self):
+        """Build a fresh dungeon in passes: layout, connectivity, placement
+
+        Special rooms are sampled from the tiles reachable from the start, so
+        the boss and the treasures can always be reached and placement never
+        has to retry until a roll happens to fit. While the layout puts walls
+        only on the outer ring, all of the interior is reachable and the
+        reachability pass is skipped.
+        """
+        for _ in range(MAX_LAYOUT_ATTEMPTS):
+            self.generate_layout()
+            if self.interior_open():
+                steps = None
+                break
+            steps = self.reachable_steps()
+            if np.count_nonzero(steps > 0) > TREASURE_ROOMS:
+                break
+        # A board too small or too walled-in to pass just gets fewer rooms
+        self.place_rooms(steps)
+        self._opaque = None
+        self.update_fov()
+
+    def generate_layout(self):
+        w, h = self.width, self.height
+
+        # Generate interior tiles from the probability bands in one pass
+        rand = self.rng.random((h, w), dtype=np.float32)
+        band = np.zeros((h, w), dtype=np.uint8)
+        for threshold in TILE_BANDS:
+            band += rand >= threshold
+        self.types[:] = BAND_TYPES[band]
+
+        # Add walls around the edges but leave a gap top and bottom
+        self.types[0, :] = TileType.WALL.value
+        self.types[-1, :] = TileType.WALL.value
+        self.types[:, 0] = TileType.WALL.value
+        self.types[:, -1] = TileType.WALL.value
+        gap_x = w // 2
+        self.types[0, gap_x] = TileType.EMPTY.value
+        self.types[-1, gap_x] = TileType.EMPTY.value
+
+        self.chars[:] = TYPE_CHAR[self.types]
+        self.flags[:] = 0
+
+        # Ensure starting tile is empty and revealed
+        px, py = self.player_pos
+        self.set_tile(px, py, TileType.EMPTY, revealed=True)
+        self.flags[py, px] |= VISITED
+
+    def interior_open(self):
+        # True if no walls stand inside the outer ring (and the player is inside it)
+        px, py = self.player_pos
+        return (self.width > 2 and self.height > 2 and 0 < px < self.width - 1 and 0 < py < self.height - 1
+                and not (self.types[1:-1, 1:-1] == TileType.WALL.value).any())
+
+    def reachable_steps(self):
+        """Flat int32 steps from the player to every tile, -1 where walls cut it off
+
+        With walls only on the outer ring (all the layout makes today) every
+        other tile is reachable in its hex distance, worked out in one pass.
+        Otherwise breadth-first over the neighbor table, a whole frontier per
+        NumPy step.
+        """
+        w, h = self.width, self.height
+        passable = (self.types != TileType.WALL.value).ravel()
+        px, py = self.player_pos
+        if self.interior_open():
+            # hexgrid.distance split into a per-column and a per-row part, so
+            # only the final max runs over the whole board
+            xs = np.arange(w, dtype=np.int32)
+            q, r = hexgrid.offset_to_axial(xs, np.zeros(w, dtype=np.int32))
+            pq, pr = hexgrid.offset_to_axial(px, py)
+            dq = (q - pq).astype(np.int32)[None, :]
+            dr = np.arange(h, dtype=np.int32)[:, None] + (r - pr).astype(np.int32)[None, :]
+            steps = np.maximum(np.abs(dr), np.abs(dr + dq))
+            np.maximum(steps, np.abs(dq), out=steps)
+            steps = steps.ravel()
+            steps[~passable] = -1
+            return steps
+
+        table = self.neighbors
+        steps = np.full(w * h, -1, dtype=np.int32)
+        slot = np.empty(w * h, dtype=np.int64)  # Scratch for dropping repeated candidates
+        frontier = np.array([py * w + px], dtype=np.int64)
+        steps[frontier] = 0
+        step = 0
+        while len(frontier):
+            step += 1
+            candidates = table[frontier].ravel()
+            candidates = candidates[candidates >= 0]
+            candidates = candidates[passable[candidates] & (steps[candidates] < 0)]
+            # Keep one copy of each tile: only the last write to its slot survives
+            order = np.arange(len(candidates))
+            slot[candidates] = order
+            candidates = candidates[slot[candidates] == order]
+            steps[candidates] = step
+            frontier = candidates
+        return steps
+
+    def place_rooms(self, steps=None):
+        """Boss room and guaranteed treasure rooms, drawn from the reachable interior
+
+        steps is reachable_steps(), or None for an open interior: then only
+        the few tiles too close to the start are worked out.
+        """
+        w, h = self.width, self.height
+        interior = np.zeros((h, w), dtype=bool)
+        interior[1:-1, 1:-1] = True
+        inner = np.zeros((h, w), dtype=bool)
+        inner[2:-2, 2:-2] = True
+        if steps is None:
+            px, py = self.player_pos
+            reachable = interior.copy()
+            reachable[py, px] = False
+            # Tiles within BOSS_MIN_STEPS - 1 of the start lie in a small window around it
+            reach = BOSS_MIN_STEPS - 1
+            x0, x1 = max(px - reach, 0), min(px + reach + 1, w)
+            y0, y1 = max(py - reach, 0), min(py + reach + 1, h)
+            xs = np.arange(x0, x1)[None, :]
+            ys = np.arange(y0, y1)[:, None]
+            far = inner.copy()
+            far[y0:y1, x0:x1] &= hexgrid.distance(xs, ys, px, py) >= BOSS_MIN_STEPS
+        else:
+            steps = steps.reshape(h, w)
+            reachable = interior & (steps > 0)
+            far = inner & (steps >= BOSS_MIN_STEPS)
+
+        # The boss keeps off the ring next to the outer wall and away from the start
+        candidates = np.flatnonzero(far)
+        if not len(candidates):
+            # Cramped board: fall back to the farthest tiles the player can reach
+            if steps is None:
+                steps = self.reachable_steps().reshape(h, w)
+            if reachable.any():
+                candidates = np.flatnonzero(reachable & (steps == steps[reachable].max()))
+        self.boss_pos = None
+        if len(candidates):
+            boss_y, boss_x = divmod(int(self.rng.choice(candidates)), w)
+            self.set_tile(boss_x, boss_y, TileType.BOSS_ROOM)
+            self.boss_pos = (boss_x, boss_y)
+
+        # Treasure rooms go on reachable empty tiles (the start and boss are taken)
+        candidates = np.flatnonzero(reachable & (self.types == TileType.EMPTY.value))
+        picks = self.rng.choice(candidates, size=min(TREASURE_ROOMS, len(candidates)), replace=False)
+        ys, xs = np.divmod(picks, w)
+        self.types[ys, xs] = TileType.TREASURE.value
+        self.chars[ys, xs] = TYPE_CHAR[TileType.TREASURE.value]
+
+    def reveal_tile(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if not self.flags[y, x] & REVEALED:
+                self.flags[y, x] |= REVEALED
+                self.dirty_tiles.add((x, y))
+                self.revision += 1
+            return TILE_TYPES[self.types[y, x]]
+        return None
+
+    @property
+    def opaque(self):
+        # Bool array of tiles that block line of sight, rebuilt after tile changes
+        if self._opaque is None:
+            self._opaque = self.types == TileType.WALL.value
+        return self._opaque
+
+    def update_fov(self):
+        """Recompute what the player can see and reveal all of it at once
+
+        Only the previous field of view is cleared, so the cost depends on the
+        light radius, not the board size.
+        """
+        flags = self.flags.ravel()
+        flags[self.visible] &= ~np.uint8(VISIBLE)
+        visible = fov.visible_tiles(self.opaque, self.player_pos, self.light_radius)
+        new = visible[(flags[visible] & REVEALED) == 0]
+        flags[visible] |= REVEALED | VISIBLE
+        self.visible = visible
+        if len(new):
+            ys, xs = np.divmod(new, self.width)
+            self.dirty_tiles.update(zip(xs.tolist(), ys.tolist()))
+        self.revision += 1
+
+    @property
+    def neighbors(self):
+        # Flat neighbor index table (see hexgrid.neighbor_table), built on first use
+        if self._neighbors is None:
+            self._neighbors = hexgrid.neighbor_table(self.width, self.height)
+        return self._neighbors
+
+    def move_player(self, dx, dy):
+        # Only steps to one of the six adjacent hexes are allowed
+        if not hexgrid.is_neighbor(self.player_pos[0], dx, dy):
+            return None
+        new_x = self.player_pos[0] + dx
+        new_y = self.player_pos[1] + dy
+
+        if 0 <= new_x < self.width and 0 <= new_y < self.height:
+            self.player_pos = (new_x, new_y)
+            tile_type = self.reveal_tile(new_x, new_y)
+            self.flags[new_y, new_x] |= VISITED
+            self.update_fov()
+            return tile_type
+        return None
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import numpy as np
+from board import GameBoard, GENERATOR_VERSION
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dungeo', 'boards')
+
+
+class BoardCache:
+    """On-disk cache of generated boards keyed by (seed, size, generator version)"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get('DUNGEO_BOARD_CACHE', DEFAULT_CACHE_DIR)
+
+    def path_for(self, seed, width, height):
+        name = f"v{GENERATOR_VERSION}-{seed}-{width}x{height}.npz"
+        return os.path.join(self.directory, name)
+
+    def load(self, seed, width, height):
+        try:
+            with np.load(self.path_for(seed, width, height)) as data:
+                boss_pos = data['boss_pos']
+                return GameBoard.from_arrays(
+                    data['types'], data['chars'], data['flags'], data['player_pos'],
+                    None if boss_pos[0] < 0 else boss_pos, seed=seed)
+        except (OSError, KeyError, ValueError):
+            # Missing or unreadable entries are just regenerated
+            return None
+
+    def store(self, board):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(board.seed, board.width, board.height)
+        # Write to a temp file and rename so concurrent readers never see a partial board
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, types=board.types, chars=board.chars, flags=board.flags,
+                         player_pos=np.array(board.player_pos),
+                         boss_pos=np.array(board.boss_pos or (-1, -1)))
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_board(self, seed, width, height=None):
+        height = width if height is None else height
+        board = self.load(seed, width, height)
+        if board is None:
+            board = GameBoard(width, height, seed=seed)
+            try:
+                self.store(board)
+            except OSError:
+                pass  # A read-only cache still hands out freshly generated boards
+        return board
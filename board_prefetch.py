@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from board import GameBoard
+
+PREFETCH_DEPTH = 2  # Boards generated ahead at most
+
+
+def build_board(seed, width, height, cache=None):
+    # Runs in a worker process; shared (seeded) dungeons still go through the disk cache
+    if cache is not None:
+        return cache.get_board(seed, width, height)
+    return GameBoard(width, height, seed=seed)
+
+
+class BoardPrefetcher:
+    """Generates upcoming boards on a process pool, so they're ready when needed
+
+    prefetch() queues a board; at most depth are kept, and queueing more
+    drops the oldest. take() hands a queued board over, waiting for it if
+    it's still being built, or builds it on the spot if it was never queued
+    or its worker failed. Boards come out the same either way.
+    """
+
+    def __init__(self, workers=1, depth=PREFETCH_DEPTH):
+        self.workers = workers
+        self.depth = depth
+        self.pool = None  # Started on first use
+        self.pending = OrderedDict()
+
+    def prefetch(self, seed, width, height=None, cache=None):
+        height = width if height is None else height
+        key = (seed, width, height, cache is not None)
+        if key in self.pending:
+            return
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending[key] = self.pool.submit(build_board, seed, width, height, cache)
+        while len(self.pending) > self.depth:
+            _, future = self.pending.popitem(last=False)
+            future.cancel()
+
+    def take(self, seed, width, height=None, cache=None):
+        height = width if height is None else height
+        future = self.pending.pop((seed, width, height, cache is not None), None)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass  # e.g. a broken pool; the board is just built here instead
+        return build_board(seed, width, height, cache)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self.pending.clear()
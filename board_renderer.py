@@ -0,0 +1,281 @@
+import math
+from collections import OrderedDict
+import numpy as np
+import pygame
+from board import TileType, CHARS, REVEALED, VISIBLE
+from hexgrid import HexLayout, hex_offsets
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+
+TILE_COLORS = {
+    TileType.EMPTY.value: (50, 50, 50),
+    TileType.MONSTER.value: (150, 50, 50),
+    TileType.TREASURE.value: (150, 150, 50),
+    TileType.STORY.value: (50, 50, 150),
+    TileType.WALL.value: (100, 100, 100),
+    TileType.BOSS_ROOM.value: (200, 0, 0),
+    TileType.STAIRS_DOWN.value: (110, 80, 40),
+    TileType.STAIRS_UP.value: (60, 110, 70),
+}
+
+TILE_SYMBOLS = {
+    TileType.WALL.value: '#',
+    TileType.BOSS_ROOM.value: '☠',  # Skull symbol for boss room
+}
+
+FOG_ALPHA = 150          # How much remembered but unseen tiles are darkened
+FOG_KEY = (255, 0, 255)  # Colorkey marking the clear parts of the fog layer
+
+CHUNK_TILES = 8         # Chunk edge length in tiles
+MAX_CACHED_CHUNKS = 48  # Pre-rendered chunks kept around (a screen needs ~9)
+
+
+class BoardRenderer:
+    """Draws the board from cached chunk surfaces, culled to the visible area
+
+    Board space puts the center of tile (0, 0) at the origin. It is cut into
+    fixed-size chunks that are rendered on demand, kept in an LRU cache and
+    repainted only where GameBoard.dirty_tiles says a tile changed. Fog of war
+    goes on top as a single screen-sized layer.
+    """
+
+    def __init__(self, board, tile_size, font, text_cache, chunk_tiles=CHUNK_TILES,
+                 max_chunks=MAX_CACHED_CHUNKS):
+        self.board = board
+        self.tile_size = tile_size
+        self.font = font
+        self.text = text_cache
+        self.radius = tile_size // 2
+        self.offsets = hex_offsets(self.radius)
+        self.layout = HexLayout(tile_size)
+        self.col_width = self.layout.col_width
+        self.chunk_w = int(chunk_tiles * self.col_width)
+        self.chunk_h = chunk_tiles * tile_size
+        self.origin = (-self.radius - 1, -self.radius - 1)  # Top-left of chunk (0, 0)
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.stamps = {}
+        self.boss_layer = pygame.Surface((tile_size + 2, tile_size + 2), pygame.SRCALPHA)
+        self.fog = None
+        self.fog_key = None
+        self.fog_rect = None
+        self.fog_stamp = None
+        self.board.dirty_tiles.clear()
+
+    def tile_center(self, x, y):
+        # Tile center in board space (odd columns shifted down)
+        return self.layout.center(x, y)
+
+    def tile_rect(self, x, y):
+        cx, cy = self.tile_center(x, y)
+        r = self.radius
+        return pygame.Rect(int(cx) - r - 1, int(cy) - r - 1, r * 2 + 3, r * 2 + 3)
+
+    def chunk_rect(self, i, j):
+        return pygame.Rect(self.origin[0] + i * self.chunk_w, self.origin[1] + j * self.chunk_h,
+                           self.chunk_w, self.chunk_h)
+
+    def tiles_touching(self, rect):
+        # Conservative range of tiles whose hex can overlap a board-space rect
+        r = self.radius + 1
+        x0 = max(0, math.floor((rect.left - r) / self.col_width))
+        x1 = min(self.board.width - 1, math.ceil((rect.right + r) / self.col_width))
+        y0 = max(0, math.floor((rect.top - r - self.tile_size // 2) / self.tile_size))
+        y1 = min(self.board.height - 1, math.ceil((rect.bottom + r) / self.tile_size))
+        return x0, x1, y0, y1
+
+    def chunks_touching(self, rect):
+        i0 = (rect.left - self.origin[0]) // self.chunk_w
+        i1 = (rect.right - 1 - self.origin[0]) // self.chunk_w
+        j0 = (rect.top - self.origin[1]) // self.chunk_h
+        j1 = (rect.bottom - 1 - self.origin[1]) // self.chunk_h
+        return i0, i1, j0, j1
+
+    def glyph(self, symbol):
+        return self.text.render(self.font, symbol, WHITE)
+
+    def stamp(self, tile_type, revealed, symbol):
+        # One pre-drawn hex per look; tiles are blitted, never re-rasterized
+        key = (tile_type, revealed, symbol)
+        surface = self.stamps.get(key)
+        if surface is None:
+            half = self.radius + 1
+            surface = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+            points = [(half + ox, half + oy) for ox, oy in self.offsets]
+            color = TILE_COLORS[tile_type] if revealed else GRAY
+            pygame.draw.polygon(surface, color, points)
+            pygame.draw.polygon(surface, WHITE, points, 1)
+            if symbol:
+                glyph = self.glyph(symbol)
+                surface.blit(glyph, glyph.get_rect(center=(half, half)))
+            self.stamps[key] = surface
+        return surface
+
+    def draw_tile(self, target, x, y, center):
+        tile_type = int(self.board.types[y, x])
+        revealed = bool(self.board.flags[y, x] & REVEALED)
+        symbol = TILE_SYMBOLS.get(tile_type, CHARS[self.board.chars[y, x]]) if revealed else ''
+        half = self.radius + 1
+        target.blit(self.stamp(tile_type, revealed, symbol),
+                    (math.floor(center[0]) - half, math.floor(center[1]) - half))
+
+    def paint_region(self, surface, surface_rect, region):
+        # Hexes overlap their neighbours, so redraw every tile touching the
+        # region in row-major order, clipped to it, to keep the draw order
+        clip = region.clip(surface_rect)
+        if not clip.width or not clip.height:
+            return
+        sx, sy = surface_rect.topleft
+        surface.set_clip(clip.move(-sx, -sy))
+        surface.fill(BLACK)
+        x0, x1, y0, y1 = self.tiles_touching(clip)
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                cx, cy = self.tile_center(x, y)
+                self.draw_tile(surface, x, y, (cx - sx, cy - sy))
+        surface.set_clip(None)
+
+    def get_chunk(self, i, j):
+        surface = self.chunks.get((i, j))
+        if surface is not None:
+            self.chunks.move_to_end((i, j))
+            return surface
+        rect = self.chunk_rect(i, j)
+        surface = pygame.Surface(rect.size).convert()
+        self.paint_region(surface, rect, rect)
+        self.chunks[(i, j)] = surface
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return surface
+
+    def update(self):
+        # Chunks that aren't cached pick up the change when they're next built
+        for x, y in self.board.dirty_tiles:
+            rect = self.tile_rect(x, y)
+            i0, i1, j0, j1 = self.chunks_touching(rect)
+            for j in range(j0, j1 + 1):
+                for i in range(i0, i1 + 1):
+                    surface = self.chunks.get((i, j))
+                    if surface is not None:
+                        self.paint_region(surface, self.chunk_rect(i, j), rect)
+        self.board.dirty_tiles.clear()
+
+    def camera_offset(self, screen_size):
+        # Screen position of the board-space origin, keeping the player centered
+        player_x, player_y = self.board.player_pos
+        ox = screen_size[0] // 2 - player_x * self.col_width
+        oy = screen_size[1] // 2 - player_y * self.tile_size
+        return int(ox), int(oy)
+
+    def pick(self, screen_pos, screen_size):
+        # Board tile under a screen position (e.g. the mouse), or None off the board
+        ox, oy = self.camera_offset(screen_size)
+        x, y = self.layout.pick(screen_pos[0] - ox, screen_pos[1] - oy)
+        if 0 <= x < self.board.width and 0 <= y < self.board.height:
+            return x, y
+        return None
+
+    def draw(self, screen, ticks):
+        self.update()
+        ox, oy = self.camera_offset(screen.get_size())
+
+        # Only chunks overlapping both the screen and the board get built or blitted
+        view = pygame.Rect(-ox, -oy, *screen.get_size())
+        i0, i1, j0, j1 = self.chunks_touching(view)
+        for j in range(j0, j1 + 1):
+            for i in range(i0, i1 + 1):
+                rect = self.chunk_rect(i, j)
+                x0, x1, y0, y1 = self.tiles_touching(rect)
+                if x0 > x1 or y0 > y1:
+                    continue
+                screen.blit(self.get_chunk(i, j), rect.move(ox, oy))
+
+        self.draw_boss_layer(screen, ticks)
+        fog, rect = self.fog_layer(screen.get_size())
+        if rect:
+            screen.blit(fog, rect, rect)
+
+    def fog_layer(self, screen_size):
+        """Overlay darkening tiles that are revealed but out of sight, and its bounds
+
+        The hexes are drawn opaque on a colorkey and the layer is blended once
+        through its surface alpha, so shared hex edges aren't darkened twice.
+        It's only rebuilt when the camera or the board changes.
+        """
+        screen_size = tuple(screen_size)
+        ox, oy = self.camera_offset(screen_size)
+        key = (screen_size, ox, oy, self.board.revision)
+        if key == self.fog_key:
+            return self.fog, self.fog_rect
+        if self.fog is None or self.fog.get_size() != screen_size:
+            self.fog = pygame.Surface(screen_size).convert()
+            self.fog.set_colorkey(FOG_KEY)
+            self.fog.set_alpha(FOG_ALPHA)
+        if self.fog_stamp is None:
+            half = self.radius + 1
+            self.fog_stamp = pygame.Surface((half * 2 + 1, half * 2 + 1)).convert()
+            self.fog_stamp.fill(FOG_KEY)
+            self.fog_stamp.set_colorkey(FOG_KEY)
+            pygame.draw.polygon(self.fog_stamp, BLACK, [(half + x, half + y) for x, y in self.offsets])
+
+        # Only the fogged tiles on screen are stamped
+        self.fog.fill(FOG_KEY)
+        x0, x1, y0, y1 = self.tiles_touching(pygame.Rect(-ox, -oy, *screen_size))
+        rect = None
+        if x0 <= x1 and y0 <= y1:
+            flags = self.board.flags[y0:y1 + 1, x0:x1 + 1]
+            ys, xs = np.nonzero((flags & (REVEALED | VISIBLE)) == REVEALED)
+            half = self.radius + 1
+            positions = []
+            for x, y in zip((xs + x0).tolist(), (ys + y0).tolist()):
+                cx, cy = self.tile_center(x, y)
+                positions.append((math.floor(cx + ox) - half, math.floor(cy + oy) - half))
+            if positions:
+                self.fog.blits([(self.fog_stamp, pos) for pos in positions], doreturn=False)
+                size = self.fog_stamp.get_width()
+                left = min(x for x, _ in positions)
+                top = min(y for _, y in positions)
+                rect = pygame.Rect(left, top, max(x for x, _ in positions) + size - left,
+                                   max(y for _, y in positions) + size - top)
+        self.fog_key = key
+        self.fog_rect = rect
+        return self.fog, rect
+
+    def animated_rect(self, screen_size):
+        # Screen rect of the pulsing boss tile, or None while it's out of sight or
+        # off screen (a remembered boss room sits still under the fog)
+        boss_pos = self.board.boss_pos
+        if boss_pos is None:
+            return None
+        bx, by = boss_pos
+        if not self.board.flags[by, bx] & VISIBLE:
+            return None
+
+        half = self.tile_size // 2 + 1
+        ox, oy = self.camera_offset(screen_size)
+        cx, cy = self.tile_center(bx, by)
+        rect = pygame.Rect((int(cx + ox) - half, int(cy + oy) - half), self.boss_layer.get_size())
+        if not rect.colliderect((0, 0) + tuple(screen_size)):
+            return None
+        return rect
+
+    def draw_boss_layer(self, screen, ticks):
+        # The pulsing boss tile is the only animated part of the board. Its hex
+        # covers the same pixels every frame, so it can be repainted on its own
+        rect = self.animated_rect(screen.get_size())
+        if rect is None:
+            return None
+
+        half = self.tile_size // 2 + 1
+        pulse = (math.sin(ticks * 0.005) + 1) * 0.5
+        color = (int(200 + pulse * 55), 0, 0)
+        points = [(half + ox, half + oy) for ox, oy in self.offsets]
+        self.boss_layer.fill((0, 0, 0, 0))
+        pygame.draw.polygon(self.boss_layer, color, points)
+        pygame.draw.polygon(self.boss_layer, WHITE, points, 1)
+        glyph = self.glyph(TILE_SYMBOLS[TileType.BOSS_ROOM.value])
+        self.boss_layer.blit(glyph, glyph.get_rect(center=(half, half)))
+        screen.blit(self.boss_layer, rect)
+        return rect
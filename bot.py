@@ -0,0 +1,308 @@
+"""Scripted bot players and a soak-test harness.
+
+A Bot plays one game from character select to the ending through a driver:
+SimulationDriver steps the headless Simulation directly, GameDriver feeds
+pygame events through the same Game.handle_event path as Game.run (under the
+SDL dummy drivers). After every step the harness checks state invariants, so
+rare state-machine bugs show up as violations with a reproducible seed.
+
+    python bot.py --games 20000 --policy greedy --backend sim
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from board import TileType, VISITED
+from simulation import GameState, CharacterClass, CLASS_SPECIALS, Simulation
+
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+COMBAT_ACTIONS = ["Attack", "Defend", "Special", "Run"]
+MAX_STEPS = 5000
+
+
+class Policy:
+    """Decides what the bot does; subclasses override choose_move"""
+    name = "base"
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose_class(self):
+        return self.rng.choice(list(CharacterClass)).name
+
+    def choose_move(self, sim):
+        raise NotImplementedError
+
+    def choose_combat(self, sim):
+        stats = sim.player_stats
+        if stats.hp < stats.max_hp * 0.3 and self.rng.random() < 0.5:
+            return "Defend"
+        if stats.spirit >= CLASS_SPECIALS[CharacterClass[sim.selected_class]][0]:
+            return "Special"
+        return "Attack"
+
+    def step_towards(self, sim, target):
+        x, y = sim.game_board.player_pos
+        tx, ty = target
+        if tx != x:
+            return (1 if tx > x else -1, 0)
+        if ty != y:
+            return (0, 1 if ty > y else -1)
+        return self.rng.choice(MOVES)
+
+
+class RandomWalkPolicy(Policy):
+    name = "random"
+
+    def choose_move(self, sim):
+        return self.rng.choice(MOVES)
+
+    def choose_combat(self, sim):
+        # Mash buttons, including Run, to exercise every combat path
+        return self.rng.choice(COMBAT_ACTIONS)
+
+
+class GreedyTreasurePolicy(Policy):
+    name = "greedy"
+
+    def choose_move(self, sim):
+        # Head for the nearest unopened treasure, then the stairs down or the boss
+        board = sim.game_board
+        treasure = (board.types == TileType.TREASURE.value) & ~(board.flags & VISITED).astype(bool)
+        ys, xs = np.nonzero(treasure)
+        if len(xs):
+            px, py = board.player_pos
+            nearest = np.argmin(np.abs(xs - px) + np.abs(ys - py))
+            return self.step_towards(sim, (int(xs[nearest]), int(ys[nearest])))
+        return self.step_towards(sim, board.boss_pos or board.stairs_pos)
+
+
+class BossRushPolicy(Policy):
+    name = "boss"
+
+    def choose_move(self, sim):
+        board = sim.game_board
+        return self.step_towards(sim, board.boss_pos or board.stairs_pos)
+
+
+POLICIES = {policy.name: policy for policy in (RandomWalkPolicy, GreedyTreasurePolicy, BossRushPolicy)}
+
+
+class SimulationDriver:
+    """Steps the headless Simulation; the monster answers immediately"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.sim = Simulation()
+
+    @property
+    def state(self):
+        return self.sim.state
+
+    def start(self, class_name):
+        self.sim.state = GameState.CHARACTER_SELECT
+        self.sim.start_game(class_name, f"Bot_{self.seed}", seed=self.seed)
+
+    def move(self, dx, dy):
+        self.sim.move_player(dx, dy)
+
+    def combat(self, action):
+        self.sim.execute_combat_action(action)
+        if self.sim.state == GameState.COMBAT and self.sim.combat_turn == "monster":
+            self.sim.handle_monster_turn()
+
+    def check(self):
+        return []
+
+
+class GameDriver:
+    """Plays through dungeo.Game with synthetic pygame events and real draws"""
+
+    KEYS = {(-1, 0): 'K_LEFT', (1, 0): 'K_RIGHT', (0, -1): 'K_UP', (0, 1): 'K_DOWN'}
+
+    def __init__(self, seed, draw=True):
+        import pygame
+        import dungeo
+        self.pygame = pygame
+        self.seed = seed
+        self.draw = draw
+        self.game = dungeo.Game(seed=seed, audio=False, video=False, prefetch=False)
+        self.game.sim.board_cache = None  # Soak runs shouldn't fill the disk cache
+        self.game.loader.wait()  # Draw real assets rather than placeholders
+        self.sim = self.game.sim
+
+    @property
+    def state(self):
+        return self.game.state
+
+    def send_key(self, key_name):
+        event = self.pygame.event.Event(self.pygame.KEYDOWN, key=getattr(self.pygame, key_name),
+                                        mod=0, unicode='')
+        self.game.handle_event(event)
+        if self.draw:
+            self.game.draw()
+
+    def start(self, class_name):
+        self.send_key('K_RETURN')  # "New Game" on the main menu
+        while self.game.selected_class != class_name:
+            self.send_key('K_RIGHT')
+        self.send_key('K_RETURN')
+
+    def move(self, dx, dy):
+        self.send_key(self.KEYS[(dx, dy)])
+
+    def combat(self, action):
+        while self.game.combat_options[self.game.combat_index] != action:
+            self.send_key('K_DOWN')
+        self.send_key('K_RETURN')
+        if self.game.monster_timer_armed:
+            # Fast-forward game time to the monster's turn instead of waiting a real second
+            scheduler = self.game.scheduler
+            scheduler.fast_forward(scheduler.time_until_next())
+            if self.draw:
+                self.game.draw()
+
+    def check(self):
+        game = self.game
+        problems = []
+        waiting = game.state == GameState.COMBAT and game.combat_turn == "monster"
+        if game.monster_timer_armed != waiting:
+            problems.append(f"monster timer armed={game.monster_timer_armed} in {game.state.name}/"
+                            f"{game.combat_turn}")
+        return problems
+
+
+def check_invariants(driver):
+    sim = driver.sim
+    problems = list(driver.check())
+    stats = sim.player_stats
+    if sim.state in (GameState.GAME_BOARD, GameState.COMBAT, GameState.ENDING):
+        if sim.game_board is None or stats is None:
+            return problems + [f"{sim.state.name} without a board or player"]
+        if stats.hp > stats.max_hp:
+            problems.append(f"hp {stats.hp} above max {stats.max_hp}")
+        if not 0 <= stats.spirit <= stats.max_spirit:
+            problems.append(f"spirit {stats.spirit} out of range")
+        x, y = sim.game_board.player_pos
+        if not (0 <= x < sim.game_board.width and 0 <= y < sim.game_board.height):
+            problems.append(f"player outside the board at {(x, y)}")
+    if sim.state == GameState.COMBAT:
+        if sim.current_monster is None:
+            problems.append("combat without a monster")
+        elif sim.battle is None or sim.battle.monsters.get(sim.battle.front) is not sim.current_monster:
+            problems.append("current monster isn't the front of the battle")
+        elif len(sim.battle.initiative) != len(sim.battle.monsters) + 1:
+            problems.append("battle turn order out of step with its monsters")
+    elif sim.combat_turn != "player" and sim.state != GameState.ENDING:
+        problems.append(f"{sim.combat_turn} turn left pending in {sim.state.name}")
+    return problems
+
+
+class Bot:
+    def __init__(self, policy, driver, max_steps=MAX_STEPS):
+        self.policy = policy
+        self.driver = driver
+        self.max_steps = max_steps
+
+    def play(self):
+        driver = self.driver
+        driver.start(self.policy.choose_class())
+        violations = check_invariants(driver)
+        steps = 0
+        fights = 0
+        while driver.state != GameState.ENDING and steps < self.max_steps:
+            if driver.state == GameState.GAME_BOARD:
+                driver.move(*self.policy.choose_move(driver.sim))
+                if driver.state == GameState.COMBAT:
+                    fights += 1
+            elif driver.state == GameState.COMBAT:
+                driver.combat(self.policy.choose_combat(driver.sim))
+            else:
+                violations.append(f"bot stranded in {driver.state.name}")
+                break
+            steps += 1
+            violations.extend(check_invariants(driver))
+
+        stats = driver.sim.player_stats
+        if driver.state != GameState.ENDING:
+            outcome = "timeout"
+        elif stats.hp > 0:
+            outcome = "victory"
+        else:
+            outcome = "death"
+        return {
+            "seed": driver.seed,
+            "outcome": outcome,
+            "steps": steps,
+            "fights": fights,
+            "level": stats.level,
+            "violations": violations,
+        }
+
+
+def play_games(task):
+    # One process-pool task: a batch of seeds with the same policy and backend
+    policy_name, backend, seeds, draw = task
+    results = []
+    for seed in seeds:
+        policy = POLICIES[policy_name](random.Random(seed))
+        if backend == "game":
+            driver = GameDriver(seed, draw=draw)
+        else:
+            driver = SimulationDriver(seed)
+        try:
+            results.append(Bot(policy, driver).play())
+        except Exception as e:
+            results.append({"seed": seed, "outcome": "crash", "steps": 0, "fights": 0,
+                            "level": 0, "violations": [f"{type(e).__name__}: {e}"]})
+    return results
+
+
+def soak(policy_name, backend, games, workers, first_seed=0, draw=True, batch=100):
+    seeds = list(range(first_seed, first_seed + games))
+    tasks = [(policy_name, backend, seeds[i:i + batch], draw) for i in range(0, games, batch)]
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch_results in pool.map(play_games, tasks):
+            results.extend(batch_results)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def report(results, elapsed):
+    outcomes = Counter(result["outcome"] for result in results)
+    failures = [result for result in results if result["violations"]]
+    print(f"{len(results)} games in {elapsed:.2f}s ({len(results) / elapsed:.0f} games/sec)")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:8s} {count:7d}  {count / len(results):6.1%}")
+    print(f"  mean steps {np.mean([r['steps'] for r in results]):.1f}, "
+          f"mean fights {np.mean([r['fights'] for r in results]):.1f}, "
+          f"mean level {np.mean([r['level'] for r in results]):.2f}")
+    print(f"  games with invariant violations: {len(failures)}")
+    for result in failures[:10]:
+        print(f"    seed {result['seed']}: {result['violations'][0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run bot players to soak-test the game logic")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--backend", choices=["sim", "game"], default="sim",
+                        help="headless Simulation, or the full Game under the SDL dummy driver")
+    parser.add_argument("--no-draw", action="store_true", help="game backend: skip draw calls")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--first-seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results, elapsed = soak(args.policy, args.backend, args.games, args.workers,
+                            args.first_seed, draw=not args.no_draw)
+    report(results, elapsed)
+    return 1 if any(result["violations"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,22 +1,47 @@
 import pygame
-import sys
+import argparse
 import os
-from enum import Enum
 import random
-import math
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
+import time
+from collections import deque
+from asset_loader import AssetLoader
+from asset_manager import AssetManager
+from board import GRID_SIZE, TileType, Tile, GameBoard
+from board_cache import BoardCache
+from board_prefetch import BoardPrefetcher
+from board_renderer import BoardRenderer
+from effects import Effects
+from font_cache import FontCache
+from pathfinding import Pathfinder
+from profiler import FrameProfiler
+from replay import InputRecorder
+import savegame
+from scheduler import Scheduler
+from simulation import GameState, CharacterClass, MonsterType, Monster, Simulation, CLASS_INFO, CLASS_SPECIALS, PLAYER
+from text_cache import TextCache
 
 # Constants
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-FPS = 60
-GRID_SIZE = 9
+FPS = 60  # Render rate cap; 0 renders uncapped. Game logic runs on the scheduler's fixed step
 TILE_SIZE = 60
 HEADER_HEIGHT = 80
 ACTION_BAR_HEIGHT = 100
+BOARD_VIEW = pygame.Rect(0, HEADER_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT - HEADER_HEIGHT - ACTION_BAR_HEIGHT)
+
+# "continuous" redraws and flips every frame; "idle" only repaints what changed
+# and sleeps in event.wait while nothing on screen is moving (kiosks)
+RENDER_MODES = ("continuous", "idle")
+IDLE_WAIT_MS = 1000
+PASSIVE_EVENTS = (pygame.NOEVENT, pygame.MOUSEMOTION)  # Never change what's drawn
+MONSTER_TURN_DELAY = 1.0  # Seconds of game time before the monster answers
+WALK_STEP_DELAY = 0.12   # Seconds of game time per step when walking to a clicked tile
+PATH_OPTIONS = {'avoid_monsters': True}  # Click-to-move goes around monsters already found
+REWIND_TURNS = 100  # Snapshots kept for Backspace; one is taken before every turn
+EMOJI_FONTS = ('segoe ui emoji', 'apple color emoji')  # Windows, Mac
+SOUND_NAMES = ('select', 'confirm', 'back')
+SEED_LIMIT = 2 ** 32  # Seeds are 0 <= seed < SEED_LIMIT, like the ones the game draws itself
+DEFAULT_SAVE_PATH = os.path.join(os.path.expanduser('~'), '.local', 'share', 'dungeo', 'quicksave.dgs')
 
 # Colors
 BLACK = (0, 0, 0)
@@ -24,173 +49,70 @@ WHITE = (255, 255, 255)
 GRAY = (128, 128, 128)
 GOLD = (255, 215, 0)
 
-class GameState(Enum):
-    MAIN_MENU = 1
-    SETTINGS = 2
-    CHARACTER_SELECT = 3
-    GAME_BOARD = 4
-    COMBAT = 5
-    ENDING = 6
-
-class CharacterClass(Enum):
-    WARRIOR = ("Warrior", "", "Tank class with high HP and defense", {
-        'HP': 120, 'ATK': 8, 'DEF': 10, 'SPD': 5,
-        'description': "A stalwart defender skilled in combat",
-        'special': "Shield Bash - Deals damage and increases defense"
-    })
-    SCOUT = ("Scout", "", "Agile class with high speed and attack", {
-        'HP': 80, 'ATK': 12, 'DEF': 5, 'SPD': 12,
-        'description': "A swift hunter with deadly precision",
-        'special': "Rapid Strike - Deals multiple hits in succession"
-    })
-    SHAMAN = ("Shaman", "", "Magical class with balanced stats", {
-        'HP': 90, 'ATK': 10, 'DEF': 7, 'SPD': 8,
-        'description': "A mystic wielder of ancient magic",
-        'special': "Healing Wave - Restores HP and boosts attack"
-    })
-
-class TileType(Enum):
-    EMPTY = 1
-    MONSTER = 2
-    TREASURE = 3
-    STORY = 4
-    WALL = 5
-    BOSS_ROOM = 6
-
-class MonsterType(Enum):
-    # Format: (name, symbol, hp_mult, atk_mult, def_mult, special_ability)
-    # Level 1-2 monsters
-    SLIME = ("Slime", "🟢", 0.8, 0.7, 0.5, "Splits into two when damaged")
-    RAT = ("Giant Rat", "🐀", 0.6, 1.0, 0.4, "Inflicts poison damage")
-    BAT = ("Vampire Bat", "🦇", 0.5, 0.8, 0.3, "Life steal attack")
-    
-    # Level 3-4 monsters
-    SKELETON = ("Skeleton Warrior", "💀", 0.9, 1.1, 0.8, "Bone armor reduces damage")
-    GOBLIN = ("Goblin Rogue", "👺", 0.8, 1.2, 0.6, "Steals gold on hit")
-    WOLF = ("Dire Wolf", "🐺", 1.0, 1.3, 0.7, "Pack tactics increase damage")
-    
-    # Level 5-7 monsters
-    GHOST = ("Haunted Spirit", "👻", 0.8, 1.4, 1.2, "Phases through attacks")
-    ORC = ("Orc Warrior", "👹", 1.3, 1.5, 1.0, "Berserker rage when low HP")
-    
-    # Level 8+ boss monsters
-    DRAGON = ("Ancient Dragon", "🐲", 2.0, 1.8, 1.6, "Breathes fire")
-    DEMON = ("Demon Lord", "👿", 1.8, 2.0, 1.5, "Summons minions")
-
-class Tile:
-    def __init__(self, type, revealed=False, char=''):
-        self.type = type
-        self.revealed = revealed
-        self.char = char
-
-class Monster:
-    def __init__(self, level):
-        self.level = level
-        # Choose monster type based on level
-        if level < 3:
-            choices = [MonsterType.SLIME, MonsterType.RAT, MonsterType.BAT]
-        elif level < 5:
-            choices = [MonsterType.SKELETON, MonsterType.GOBLIN, MonsterType.WOLF]
-        elif level < 8:
-            choices = [MonsterType.GHOST, MonsterType.ORC]
-        else:
-            choices = [MonsterType.DRAGON, MonsterType.DEMON]
-        
-        self.type = random.choice(choices)
-        base_hp = 50 + level * 10
-        base_atk = 5 + level * 2
-        base_def = 3 + level
-        
-        self.name = self.type.value[0]
-        self.emoji = self.type.value[1]
-        self.hp = int(base_hp * self.type.value[2])
-        self.max_hp = self.hp
-        self.atk = int(base_atk * self.type.value[3])
-        self.def_ = int(base_def * self.type.value[4])
-        self.special_ability = self.type.value[5]
-        self.exp_reward = 20 + level * 10
-
-class GameBoard:
-    def __init__(self):
-        self.grid = []
-        self.player_pos = (4, 4)  # Center of 9x9 grid
-        self.generate_board()
-
-    def generate_board(self):
-        # Generate tiles based on probability
-        for y in range(GRID_SIZE):
-            row = []
-            for x in range(GRID_SIZE):
-                # Add walls around the edges but ensure there's a path
-                if (x == 0 or x == GRID_SIZE-1 or y == 0 or y == GRID_SIZE-1) and (x, y) != (4, 0) and (x, y) != (4, GRID_SIZE-1):
-                    tile_type = TileType.WALL
-                    char = '#'
-                else:
-                    rand = random.random()
-                    if rand < 0.65:  # Increased empty space probability
-                        tile_type = TileType.EMPTY
-                        char = ''
-                    elif rand < 0.80:  # Reduced monster probability
-                        tile_type = TileType.MONSTER
-                        char = ''
-                    elif rand < 0.90:  # Increased treasure probability
-                        tile_type = TileType.TREASURE
-                        char = '$'
-                    else:
-                        tile_type = TileType.STORY
-                        char = '?'
-                row.append(Tile(tile_type, False, char))
-            self.grid.append(row)
-        
-        # Ensure starting tile is empty and revealed
-        self.grid[self.player_pos[1]][self.player_pos[0]] = Tile(TileType.EMPTY, True, '')
-        
-        # Generate a boss room away from start
-        while True:
-            boss_x = random.randint(2, GRID_SIZE - 3)
-            boss_y = random.randint(2, GRID_SIZE - 3)
-            # Ensure boss room is at least 3 tiles away from start
-            if abs(boss_x - self.player_pos[0]) + abs(boss_y - self.player_pos[1]) >= 3:
-                self.grid[boss_y][boss_x] = Tile(TileType.BOSS_ROOM, False, 'B')
-                break
-        
-        # Add some guaranteed treasure rooms
-        treasure_count = 0
-        while treasure_count < 3:  # Ensure at least 3 treasure rooms
-            x = random.randint(1, GRID_SIZE - 2)
-            y = random.randint(1, GRID_SIZE - 2)
-            if self.grid[y][x].type == TileType.EMPTY:
-                self.grid[y][x] = Tile(TileType.TREASURE, False, '$')
-                treasure_count += 1
-
-    def reveal_tile(self, x, y):
-        if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
-            self.grid[y][x].revealed = True
-            return self.grid[y][x].type
-        return None
+def init_pygame(audio=True, video=True):
+    """Start only the SDL subsystems the game uses; returns whether there is audio
 
-    def move_player(self, dx, dy):
-        new_x = self.player_pos[0] + dx
-        new_y = self.player_pos[1] + dy
-        
-        if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE:
-            self.player_pos = (new_x, new_y)
-            return self.reveal_tile(new_x, new_y)
-        return None
+    Nothing happens at import, so tools can import this module for free.
+    Without video the dummy driver is used: surfaces, fonts and events still
+    work, nothing is shown. The dummy drivers override whatever SDL_*DRIVER
+    the environment asks for, so video=False never opens a window.
+    """
+    if not video:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    if not audio:
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.display.init()
+    pygame.font.init()
+    if not audio:
+        return False
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        return False  # No audio device; play silently
+    return True
+
+def _sim_attr(name):
+    # Game state lives on the Simulation; Game just reads and writes through
+    return property(lambda self: getattr(self.sim, name),
+                    lambda self, value: setattr(self.sim, name, value))
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    state = _sim_attr('state')
+    character_name = _sim_attr('character_name')
+    selected_class = _sim_attr('selected_class')
+    game_board = _sim_attr('game_board')
+    game_seed = _sim_attr('game_seed')
+    player_stats = _sim_attr('player_stats')
+    current_monster = _sim_attr('current_monster')
+    battle = _sim_attr('battle')
+    combat_message = _sim_attr('combat_message')
+    combat_turn = _sim_attr('combat_turn')
+
+    def __init__(self, seed=None, profile_dump=None, render_mode="continuous", fps=FPS, vsync=False,
+                 session_seed=None, record=None, save_path=None, audio=True, video=True, prefetch=True):
+        self.audio = init_pygame(audio, video)
+
+        # Everything random in a session comes from these two seeds, so it can be replayed
+        if session_seed is None:
+            session_seed = random.randrange(SEED_LIMIT)
+        self.session_seed = session_seed
+        self.rng = random.Random(session_seed)
+        self.sim = Simulation(seed, BoardCache(), rng=random.Random(session_seed),
+                              prefetcher=BoardPrefetcher() if prefetch else None)
+        if vsync:
+            # SDL only honours vsync on a renderer-backed (SCALED) window
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync=1)
+        else:
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Dungeo")
         self.clock = pygame.time.Clock()
-        self.state = GameState.MAIN_MENU
+        self.fps = fps
+        self.scheduler = Scheduler()  # Game time: timers and animations, independent of frame rate
         self.sound_on = True
         self.menu_index = 0
         self.menu_options = ["New Game", "Settings", "Exit"]
         self.settings_options = ["Sound: ON", "God Mode: OFF"]
         self.settings_index = 0
-        self.character_name = ""
-        self.selected_class = None
         self.class_stats = {
             CharacterClass.WARRIOR: {"HP": 100, "ATK": 8, "DEF": 7},
             CharacterClass.SCOUT: {"HP": 70, "ATK": 10, "DEF": 5},
@@ -198,83 +120,94 @@ class Game:
         }
         self.god_mode = False
         
-        # Load assets
-        self.background = pygame.image.load(os.path.join('assets', 'dungeo.jpg'))
-        self.background = pygame.transform.scale(self.background, (WINDOW_WIDTH, WINDOW_HEIGHT))
-        
-        # Font setup
-        try:
-            self.emoji_font = pygame.font.SysFont('segoe ui emoji', 32)  # Windows emoji font
-        except:
-            try:
-                self.emoji_font = pygame.font.SysFont('apple color emoji', 32)  # Mac emoji font
-            except:
-                self.emoji_font = pygame.font.Font(None, 32)  # Fallback to default
-        
+        # Assets load once, already converted to the display format. The slow
+        # ones stream in on a worker thread; until then placeholders are drawn
+        self.assets = AssetManager((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.background = self.assets.blank_background()
+        self.emoji_font = pygame.font.Font(None, 32)  # Until the system emoji font is found
         self.title_font = pygame.font.Font(None, 74)
         self.menu_font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.text = TextCache()  # Shared by all draw code and mouse hit-testing
+        self.effects = Effects()
 
-        # Load sounds
+        # Silent sounds until the real ones load (or if the files are missing);
+        # none at all without audio
         self.sounds = {}
-        try:
-            self.sounds['select'] = pygame.mixer.Sound('assets/select.wav')
-            self.sounds['confirm'] = pygame.mixer.Sound('assets/confirm.wav')
-            self.sounds['back'] = pygame.mixer.Sound('assets/back.wav')
-        except:
-            # If sound files are missing, create silent sounds
+        if self.audio:
             empty_sound = pygame.mixer.Sound(buffer=b'')
-            self.sounds = {
-                'select': empty_sound,
-                'confirm': empty_sound,
-                'back': empty_sound
-            }
-        
-        # Set sound volumes
-        for sound in self.sounds.values():
-            sound.set_volume(0.3)
-        
-        self.game_board = None
-        self.player_stats = None
-        self.current_monster = None
+            self.sounds = {name: empty_sound for name in SOUND_NAMES}
+
+        self.loader = AssetLoader()
+        self.queue_assets()
+        self.loader.start()
+
         self.combat_options = ["Attack", "Defend", "Special", "Run"]
         self.combat_index = 0
-        self.combat_message = ""
-        self.combat_turn = "player"  # player or monster
+        self.board_renderer = None
+        self.pathfinder = None
+        self.monster_timer = None
+        self.walk_path = []      # Tiles still to step through after a click
+        self.walk_timer = None
+        self.hover_tile = None   # Tile under the mouse, for the path preview
 
-    def init_game(self):
-        # Initialize game board
-        self.game_board = GameBoard()
-        
-        # Get stats from CharacterClass enum
-        class_data = CharacterClass[self.selected_class].value[3]
-        
-        # Initialize player stats
-        self.player_stats = {
-            'name': self.character_name,
-            'class': self.selected_class,
-            'level': 1,
-            'exp': 0,
-            'hp': class_data['HP'],
-            'max_hp': class_data['HP'],
-            'atk': class_data['ATK'],
-            'def': class_data['DEF'],
-            'spd': class_data['SPD'],
-            'spirit': 100,
-            'max_spirit': 100
-        }
-        
-        # Initialize combat variables
+        # Frame timing: always recorded, shown with F3, written out on exit if asked
+        self.profiler = FrameProfiler()
+        self.profiler.wrap(self, [name for name in self.profiler.sections if name.startswith('draw_')])
+        self.profile_dump = profile_dump
+        self.show_profiler = False
+
+        self.render_mode = render_mode
+        self.needs_redraw = True  # Set by input; idle mode repaints only then or for animations
+        self.recorder = InputRecorder(record, seed, session_seed) if record else None
+
+        # Quicksave file (F5/F9) and in-memory snapshots for rewinding turns
+        self.save_path = save_path or os.environ.get('DUNGEO_SAVE', DEFAULT_SAVE_PATH)
+        self.history = deque(maxlen=REWIND_TURNS)
+
+    def queue_assets(self):
+        loader = self.loader
+        loader.add(lambda: self.assets.load_background('dungeo.jpg'), self.set_background)
+        for char_class in CharacterClass:
+            name = char_class.name.lower()
+            loader.add(lambda name=name: self.assets.load_portrait(name),
+                       lambda images, name=name: self.assets.add_portrait(name, images))
+        loader.add(self.load_emoji_font, self.set_emoji_font)
+        for name in SOUND_NAMES if self.audio else ():
+            loader.add(lambda name=name: pygame.mixer.Sound(f'assets/{name}.wav'),
+                       lambda sound, name=name: self.set_sound(name, sound))
+
+    def set_background(self, image):
+        self.background = image
+
+    def load_emoji_font(self):
+        # System font lookups scan every installed font; the paths are cached on disk
+        fonts = FontCache()
+        path = fonts.find(EMOJI_FONTS)
+        fonts.save()
+        return pygame.font.Font(path, 32) if path else None
+
+    def set_emoji_font(self, font):
+        self.emoji_font = font
+
+    def set_sound(self, name, sound):
+        sound.set_volume(0.3)
+        self.sounds[name] = sound
+
+    @property
+    def monster_timer_armed(self):
+        return self.monster_timer is not None
+
+    def init_game(self, seed=None):
+        self.history.clear()
+        self.sim.init_game(seed)
         self.combat_options = ["Attack", "Defend", "Special", "Run"]
         self.combat_index = 0
-        self.combat_message = ""
-        self.combat_turn = "player"
-        self.current_monster = None
 
     def generate_random_name(self):
         prefixes = ["Brave", "Swift", "Wise", "Shadow", "Storm", "Moon", "Sun", "Star"]
         suffixes = ["walker", "hunter", "seeker", "spirit", "runner", "watcher"]
-        return f"{random.choice(prefixes)}{random.choice(suffixes)}"
+        return f"{self.rng.choice(prefixes)}{self.rng.choice(suffixes)}"
 
     def handle_main_menu_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -285,11 +218,10 @@ class Game:
             elif event.key in [pygame.K_RETURN, pygame.K_SPACE]:
                 self.select_menu_option()
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = event.pos
             # Check if any menu option was clicked
             for i, option in enumerate(self.menu_options):
-                text_surface = self.menu_font.render(option, True, WHITE)
-                text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, 300 + i * 50))
+                text_rect = self.text.get_rect(self.menu_font, option, center=(WINDOW_WIDTH // 2, 300 + i * 50))
                 if text_rect.collidepoint(mouse_pos):
                     self.menu_index = i
                     self.select_menu_option()
@@ -302,8 +234,8 @@ class Game:
         elif self.menu_options[self.menu_index] == "Settings":
             self.state = GameState.SETTINGS
         elif self.menu_options[self.menu_index] == "Exit":
-            pygame.quit()
-            sys.exit()
+            # Leave through the main loop so recordings and profiles get written
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
 
     def handle_settings_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -314,10 +246,9 @@ class Game:
             elif event.key in [pygame.K_DOWN, pygame.K_s]:
                 self.settings_index = (self.settings_index + 1) % len(self.settings_options)
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = event.pos
             for i, option in enumerate(self.settings_options):
-                text_surface = self.menu_font.render(option, True, WHITE)
-                text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, 300 + i * 50))
+                text_rect = self.text.get_rect(self.menu_font, option, center=(WINDOW_WIDTH // 2, 300 + i * 50))
                 if text_rect.collidepoint(mouse_pos):
                     if "Sound" in option:
                         self.sound_on = not self.sound_on
@@ -342,17 +273,14 @@ class Game:
                 self.play_sound('select')
             elif event.key == pygame.K_RETURN:
                 if self.selected_class:
-                    self.character_name = f"Hero_{random.randint(1000, 9999)}"
-                    self.initialize_player_stats()
-                    self.state = GameState.GAME_BOARD
-                    self.play_sound('confirm')
+                    self.confirm_character()
             elif event.key == pygame.K_ESCAPE:
                 self.state = GameState.MAIN_MENU
                 self.play_sound('back')
         
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left click
-                mouse_x, mouse_y = pygame.mouse.get_pos()
+                mouse_x, mouse_y = event.pos
                 
                 # Calculate box positions
                 box_width = 220
@@ -372,69 +300,96 @@ class Game:
                             self.selected_class = char_class.name
                             self.play_sound('select')
                         else:  # Double click to confirm
-                            self.character_name = f"Hero_{random.randint(1000, 9999)}"
-                            self.initialize_player_stats()
-                            self.state = GameState.GAME_BOARD
-                            self.play_sound('confirm')
+                            self.confirm_character()
+
+    def confirm_character(self):
+        # Build the dungeon right away; input handling must not depend on a draw
+        self.character_name = f"Hero_{self.rng.randint(1000, 9999)}"
+        self.init_game()
+        self.state = GameState.GAME_BOARD
+        self.play_sound('confirm')
 
     def initialize_player_stats(self):
-        # Get the selected class's stats
-        class_data = CharacterClass[self.selected_class].value[3]
-        
-        self.player_stats = {
-            'name': self.character_name,
-            'class': self.selected_class,
-            'level': 1,
-            'exp': 0,
-            'hp': class_data['HP'],
-            'max_hp': class_data['HP'],
-            'atk': class_data['ATK'],
-            'def': class_data['DEF'],
-            'spd': class_data['SPD'],
-            'spirit': 100,
-            'max_spirit': 100
-        }
+        self.sim.initialize_player_stats()
 
     def handle_game_board_input(self, event):
         if event.type == pygame.KEYDOWN:
+            self.stop_walking()  # Any key takes over from click-to-move
             if event.key == pygame.K_ESCAPE:
                 self.state = GameState.MAIN_MENU
             elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                tile_type = self.game_board.move_player(-1, 0)
-                self.process_tile_event(tile_type)
+                self.move_player(-1, 0)
             elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                tile_type = self.game_board.move_player(1, 0)
-                self.process_tile_event(tile_type)
+                self.move_player(1, 0)
             elif event.key in [pygame.K_UP, pygame.K_w]:
-                tile_type = self.game_board.move_player(0, -1)
-                self.process_tile_event(tile_type)
+                self.move_player(0, -1)
             elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                tile_type = self.game_board.move_player(0, 1)
-                self.process_tile_event(tile_type)
+                self.move_player(0, 1)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            tile = self.tile_at(event.pos)
+            if tile is not None:
+                self.walk_to(tile)
+        elif event.type == pygame.MOUSEMOTION:
+            tile = self.tile_at(event.pos)
+            if tile != self.hover_tile:
+                self.hover_tile = tile
+                self.needs_redraw = True
 
-    def process_tile_event(self, tile_type):
-        if tile_type == TileType.MONSTER:
-            self.current_monster = Monster(self.player_stats['level'])
-            self.combat_index = 0
-            self.combat_message = f"A {self.current_monster.name} appears!"
-            self.combat_turn = "player"
-            self.state = GameState.COMBAT
-        elif tile_type == TileType.TREASURE:
-            # Heal player and give spirit points
-            heal = min(20, self.player_stats['max_hp'] - self.player_stats['hp'])
-            self.player_stats['hp'] += heal
-            spirit_gain = min(20, self.player_stats['max_spirit'] - self.player_stats['spirit'])
-            self.player_stats['spirit'] += spirit_gain
-            if heal > 0 or spirit_gain > 0:
-                self.combat_message = f"Found treasure! Healed {heal} HP and gained {spirit_gain} Spirit!"
-        elif tile_type == TileType.STORY:
-            self.combat_message = "You discover an ancient inscription..."
-        elif tile_type == TileType.BOSS_ROOM:
-            self.current_monster = Monster(self.player_stats['level'] + 5)
+    def board_view(self):
+        # Renderer and pathfinder for the current board, rebuilt when the board changes
+        if self.board_renderer is None or self.board_renderer.board is not self.game_board:
+            self.board_renderer = BoardRenderer(self.game_board, TILE_SIZE, self.menu_font, self.text)
+            self.pathfinder = Pathfinder(self.game_board)
+        return self.board_renderer
+
+    def tile_at(self, pos):
+        # Board tile under a screen position, or None outside the board area
+        if not BOARD_VIEW.collidepoint(pos):
+            return None
+        return self.board_view().pick(pos, self.screen.get_size())
+
+    def plan_path(self, tile):
+        # Read off the cached distance field when the tile is close, else run A*
+        self.board_view()
+        start = self.game_board.player_pos
+        path = self.pathfinder.path_from_field(start, tile, **PATH_OPTIONS)
+        if path is None:
+            path = self.pathfinder.find_path(start, tile, **PATH_OPTIONS)
+        return path
+
+    def walk_to(self, tile):
+        self.stop_walking()
+        self.walk_path = self.plan_path(tile) or []
+        if self.walk_path:
+            self.walk_step()  # First step right away, the rest on the scheduler
+
+    def walk_step(self):
+        self.walk_timer = None
+        if self.state != GameState.GAME_BOARD or not self.walk_path:
+            self.walk_path = []
+            return
+        x, y = self.walk_path.pop(0)
+        px, py = self.game_board.player_pos
+        self.move_player(x - px, y - py)
+        self.needs_redraw = True
+        if self.walk_path and self.state == GameState.GAME_BOARD:
+            self.walk_timer = self.scheduler.call_later(WALK_STEP_DELAY, self.walk_step)
+        else:
+            self.walk_path = []
+
+    def stop_walking(self):
+        self.scheduler.cancel(self.walk_timer)
+        self.walk_timer = None
+        self.walk_path = []
+
+    def move_player(self, dx, dy):
+        self.history.append(savegame.dumps(self.sim))
+        board = self.game_board
+        self.sim.move_player(dx, dy)
+        if self.game_board is not board:
+            self.stop_walking()  # Took the stairs; the rest of the path was on the old floor
+        if self.state == GameState.COMBAT:
             self.combat_index = 0
-            self.combat_message = f"A {self.current_monster.name} appears!"
-            self.combat_turn = "player"
-            self.state = GameState.COMBAT
 
     def handle_combat_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -447,95 +402,60 @@ class Game:
                     self.execute_combat_action()
 
     def execute_combat_action(self):
-        action = self.combat_options[self.combat_index]
-        
-        if action == "Attack":
-            # Calculate damage
-            damage = max(1, self.player_stats['atk'] - self.current_monster.def_)
-            self.current_monster.hp -= damage
-            self.combat_message = f"You deal {damage} damage!"
-            
-        elif action == "Defend":
-            # Increase defense temporarily and heal
-            self.player_stats['def'] += 2
-            heal = min(10, self.player_stats['max_hp'] - self.player_stats['hp'])
-            self.player_stats['hp'] += heal
-            self.combat_message = f"Defense up! Healed {heal} HP!"
-            
-        elif action == "Special" and self.player_stats['spirit'] >= 20:
-            # Special attack that uses spirit points
-            self.player_stats['spirit'] -= 20
-            damage = self.player_stats['atk'] * 2
-            self.current_monster.hp -= damage
-            self.combat_message = f"Special attack deals {damage} damage!"
-            
-        elif action == "Run":
-            # Can't run from boss battles
-            if self.current_monster.level >= self.player_stats['level'] + 5:
-                self.combat_message = "Cannot escape from a boss battle!"
-                return
-            # 50% chance to run
-            if random.random() > 0.5:
-                self.state = GameState.GAME_BOARD
-                self.combat_message = "Got away safely!"
-                return
-            else:
-                self.combat_message = "Couldn't escape!"
-    
-        # Check if monster is defeated
-        if self.current_monster.hp <= 0:
-            self.player_stats['exp'] += self.current_monster.exp_reward
-            victory_message = f"{self.current_monster.name} defeated! Gained {self.current_monster.exp_reward} EXP!"
-            
-            # Check if this was a boss monster
-            if self.current_monster.level >= self.player_stats['level'] + 5:
-                victory_message += "\nCongratulations! You have defeated the boss and won the game!"
-                self.combat_message = victory_message
-                self.state = GameState.ENDING
-                return
-                
-            self.combat_message = victory_message
-            # Level up check
-            if self.player_stats['exp'] >= self.player_stats['level'] * 100:
-                self.player_stats['level'] += 1
-                self.player_stats['exp'] = 0
-                self.player_stats['max_hp'] += 10
-                self.player_stats['hp'] = self.player_stats['max_hp']
-                self.player_stats['atk'] += 2
-                self.player_stats['def'] += 1
-                self.combat_message += f"\nLevel Up! Now level {self.player_stats['level']}!"
-            self.state = GameState.GAME_BOARD
-            return
-        
-        # Monster's turn
-        self.combat_turn = "monster"
-        pygame.time.set_timer(pygame.USEREVENT, 1000)  # Monster attacks after 1 second
+        self.history.append(savegame.dumps(self.sim))
+        self.sim.execute_combat_action(self.combat_options[self.combat_index])
+        if self.state == GameState.COMBAT and self.combat_turn == "monster":
+            # Monster attacks after a second of game time
+            self.monster_timer = self.scheduler.call_later(MONSTER_TURN_DELAY, self.monster_timer_due)
+
+    def monster_timer_due(self):
+        self.monster_timer = None
+        if self.state == GameState.COMBAT and self.combat_turn == "monster":
+            self.handle_monster_turn()
+            self.needs_redraw = True
 
     def handle_monster_turn(self):
-        # Calculate monster damage
-        damage = max(1, self.current_monster.atk - self.player_stats['def'])
-        self.player_stats['hp'] -= damage
-        self.combat_message = f"{self.current_monster.name} deals {damage} damage!"
-        
-        # Reset temporary defense buff
-        class_data = CharacterClass[self.selected_class].value[3]
-        self.player_stats['def'] = class_data['DEF']
-        
-        # Check if player is defeated
-        if self.player_stats['hp'] <= 0:
-            self.state = GameState.ENDING
-        else:
-            self.combat_turn = "player"
+        self.scheduler.cancel(self.monster_timer)
+        self.monster_timer = None
+        self.sim.handle_monster_turn()
+
+    def restore_snapshot(self, data):
+        # A snapshot that fails to parse leaves the session, timers included, as it was
+        savegame.restore(self.sim, data)
+        self.stop_walking()
+        self.scheduler.cancel(self.monster_timer)
+        self.monster_timer = None
+        self.combat_index = 0
+        if self.state == GameState.COMBAT and self.combat_turn == "monster":
+            self.monster_timer = self.scheduler.call_later(MONSTER_TURN_DELAY, self.monster_timer_due)
+
+    def rewind(self):
+        # Undo the last move or combat action
+        if self.history:
+            self.restore_snapshot(self.history.pop())
+            self.play_sound('back')
+
+    def quicksave(self):
+        try:
+            savegame.save(self.sim, self.save_path)
+            self.play_sound('confirm')
+        except OSError:
+            self.play_sound('back')
+
+    def quickload(self):
+        try:
+            with open(self.save_path, 'rb') as f:
+                self.restore_snapshot(f.read())
+        except (OSError, ValueError):
+            self.play_sound('back')  # No save yet, or an unreadable one
+            return
+        self.history.clear()
+        self.play_sound('confirm')
 
     def handle_ending_input(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                self.state = GameState.MAIN_MENU
-                self.player_stats = None
-                self.game_board = None
-                self.current_monster = None
-                self.combat_message = ""
-                self.combat_turn = "player"
+                self.sim.reset()
                 self.combat_index = 0
 
     def play_sound(self, sound_name):
@@ -546,73 +466,28 @@ class Game:
             except:
                 pass  # Silently fail if sound playback fails
 
-    def draw_hex_tile(self, x, y, revealed, tile_type, char):
-        # Calculate pixel coordinates for hexagonal grid
-        pixel_x = WINDOW_WIDTH // 2 + (x - self.game_board.player_pos[0]) * TILE_SIZE * 0.75
-        pixel_y = WINDOW_HEIGHT // 2 + (y - self.game_board.player_pos[1]) * TILE_SIZE
-        if x % 2:
-            pixel_y += TILE_SIZE // 2
-
-        # Draw hex shape
-        points = []
-        for i in range(6):
-            angle = i * 60 - 30
-            px = pixel_x + TILE_SIZE // 2 * math.cos(math.radians(angle))
-            py = pixel_y + TILE_SIZE // 2 * math.sin(math.radians(angle))
-            points.append((px, py))
-
-        color = GRAY
-        if revealed:
-            if tile_type == TileType.EMPTY:
-                color = (50, 50, 50)
-            elif tile_type == TileType.MONSTER:
-                color = (150, 50, 50)
-            elif tile_type == TileType.TREASURE:
-                color = (150, 150, 50)
-            elif tile_type == TileType.STORY:
-                color = (50, 50, 150)
-            elif tile_type == TileType.WALL:
-                color = (100, 100, 100)
-            elif tile_type == TileType.BOSS_ROOM:
-                # Pulsating red color for boss room
-                pulse = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 0.5
-                red = int(200 + pulse * 55)
-                color = (red, 0, 0)
-
-        pygame.draw.polygon(self.screen, color, points)
-        pygame.draw.polygon(self.screen, WHITE, points, 1)
-
-        # Draw tile character or symbol
-        if revealed:
-            symbol = char
-            if tile_type == TileType.WALL:
-                symbol = '#'
-            elif tile_type == TileType.BOSS_ROOM:
-                symbol = '☠'  # Skull symbol for boss room
-        
-            if symbol:
-                char_surface = self.menu_font.render(symbol, True, WHITE)
-                char_rect = char_surface.get_rect(center=(pixel_x, pixel_y))
-                self.screen.blit(char_surface, char_rect)
-
     def draw_header(self):
         # Draw header background
         pygame.draw.rect(self.screen, (30, 30, 30), (0, 0, WINDOW_WIDTH, HEADER_HEIGHT))
         
         # Draw player info
-        name_text = self.menu_font.render(self.character_name, True, WHITE)
+        name_text = self.text.render(self.menu_font, self.character_name, WHITE)
         self.screen.blit(name_text, (20, 20))
         
         # Draw HP bar
-        hp_text = f"HP: {self.player_stats['hp']}/{self.player_stats['max_hp']}"
-        hp_surface = self.menu_font.render(hp_text, True, WHITE)
+        hp_text = f"HP: {self.player_stats.hp}/{self.player_stats.max_hp}"
+        hp_surface = self.text.render(self.menu_font, hp_text, WHITE)
         self.screen.blit(hp_surface, (200, 20))
         
         # Draw Spirit points
-        spirit_text = f"Spirit: {self.player_stats['spirit']}/{self.player_stats['max_spirit']}"
-        spirit_surface = self.menu_font.render(spirit_text, True, WHITE)
+        spirit_text = f"Spirit: {self.player_stats.spirit}/{self.player_stats.max_spirit}"
+        spirit_surface = self.text.render(self.menu_font, spirit_text, WHITE)
         self.screen.blit(spirit_surface, (400, 20))
 
+        floor_text = f"Floor {self.sim.depth + 1}/{self.sim.floor_count}"
+        floor_surface = self.text.render(self.menu_font, floor_text, WHITE)
+        self.screen.blit(floor_surface, (630, 20))
+
     def draw_action_bar(self):
         # Draw action bar background
         bar_rect = (0, WINDOW_HEIGHT - ACTION_BAR_HEIGHT, WINDOW_WIDTH, ACTION_BAR_HEIGHT)
@@ -620,77 +495,89 @@ class Game:
         
         # Draw controls help
         controls_text = "Controls: Arrow Keys/WASD to move | ESC for menu"
-        controls_surface = self.menu_font.render(controls_text, True, WHITE)
+        controls_surface = self.text.render(self.menu_font, controls_text, WHITE)
         self.screen.blit(controls_surface, (20, WINDOW_HEIGHT - 40))
 
     def draw_game_board(self):
         if not self.game_board:
             self.init_game()
+        renderer = self.board_view()
 
         self.screen.fill(BLACK)
         
-        # Draw game board grid
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                tile = self.game_board.grid[y][x]
-                self.draw_hex_tile(x, y, tile.revealed, tile.type, tile.char)
+        # Blit the cached board layer; only changed tiles get repainted
+        renderer.draw(self.screen, self.scheduler.ticks)
+        self.draw_path_preview(renderer)
         
         # Draw header and action bar
         self.draw_header()
         self.draw_action_bar()
 
+    def draw_path_preview(self, renderer, clip=BOARD_VIEW):
+        # Dots along the route click-to-move would take to the hovered tile
+        path = self.walk_path
+        if not path and self.hover_tile is not None:
+            path = self.pathfinder.path_from_field(self.game_board.player_pos, self.hover_tile,
+                                                   **PATH_OPTIONS) or []
+        if not path:
+            return
+        ox, oy = renderer.camera_offset(self.screen.get_size())
+        self.screen.set_clip(clip)
+        for x, y in path:
+            cx, cy = renderer.tile_center(x, y)
+            pygame.draw.circle(self.screen, GOLD, (int(cx + ox), int(cy + oy)), 4)
+        self.screen.set_clip(None)
+
     def draw_main_menu(self):
         # Draw background
         self.screen.blit(self.background, (0, 0))
         
         # Draw title
-        title_surface = self.title_font.render("DUNGEO", True, GOLD)
+        title_surface = self.text.render(self.title_font, "DUNGEO", GOLD)
         title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, 150))
         self.screen.blit(title_surface, title_rect)
         
         # Draw menu options
         for i, option in enumerate(self.menu_options):
             color = GOLD if i == self.menu_index else WHITE
-            text_surface = self.menu_font.render(option, True, color)
+            text_surface = self.text.render(self.menu_font, option, color)
             text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, 300 + i * 50))
             self.screen.blit(text_surface, text_rect)
         
         # Draw sound status
         sound_text = "Sound: ON" if self.sound_on else "Sound: OFF"
-        sound_surface = self.menu_font.render(sound_text, True, WHITE)
+        sound_surface = self.text.render(self.menu_font, sound_text, WHITE)
         self.screen.blit(sound_surface, (10, WINDOW_HEIGHT - 30))
 
     def draw_settings(self):
         self.screen.fill(BLACK)
         
         # Draw title
-        title_surface = self.title_font.render("SETTINGS", True, GOLD)
+        title_surface = self.text.render(self.title_font, "SETTINGS", GOLD)
         title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, 150))
         self.screen.blit(title_surface, title_rect)
         
         # Draw options
         for i, option in enumerate(self.settings_options):
             color = GOLD if i == self.settings_index else WHITE
-            text_surface = self.menu_font.render(option, True, color)
+            text_surface = self.text.render(self.menu_font, option, color)
             text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, 300 + i * 50))
             self.screen.blit(text_surface, text_rect)
         
         # Draw back instruction
         back_text = "Press ESC to return to main menu"
-        back_surface = self.menu_font.render(back_text, True, GRAY)
+        back_surface = self.text.render(self.menu_font, back_text, GRAY)
         back_rect = back_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
         self.screen.blit(back_surface, back_rect)
 
     def draw_character_select(self):
         # Draw semi-transparent background
-        bg_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        bg_surface.fill((20, 20, 40))
-        bg_surface.set_alpha(230)
+        bg_surface = self.assets.get_overlay((WINDOW_WIDTH, WINDOW_HEIGHT), (20, 20, 40), 230)
         self.screen.blit(bg_surface, (0, 0))
 
         # Draw title with shadow effect
-        title_shadow = self.title_font.render("Choose Your Hero", True, (0, 0, 0))
-        title = self.title_font.render("Choose Your Hero", True, GOLD)
+        title_shadow = self.text.render(self.title_font, "Choose Your Hero", (0, 0, 0))
+        title = self.text.render(self.title_font, "Choose Your Hero", GOLD)
         shadow_rect = title_shadow.get_rect(center=(WINDOW_WIDTH // 2 + 2, 52))
         title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 50))
         self.screen.blit(title_shadow, shadow_rect)
@@ -712,24 +599,16 @@ class Game:
             # Draw box background with gradient effect
             is_selected = char_class.name == self.selected_class
             if is_selected:
-                for j in range(box_height):
-                    alpha = 100 + (j / box_height) * 155
-                    line_color = (60, 60, 100, alpha)
-                    pygame.draw.line(self.screen, line_color, 
-                                   (x, y + j), (x + box_width, y + j))
+                gradient = self.effects.vertical_alpha_gradient((box_width + 1, box_height), (60, 60, 100), 100, 255)
+                self.screen.blit(gradient, (x, y))
             else:
                 pygame.draw.rect(self.screen, (40, 40, 60), (x, y, box_width, box_height))
             
             # Draw selection effects
             if is_selected:
                 # Glowing border effect
-                for offset in range(3):
-                    border_alpha = 255 - (offset * 60)
-                    border_color = (*GOLD, border_alpha)
-                    pygame.draw.rect(self.screen, border_color, 
-                                   (x - offset, y - offset, 
-                                    box_width + offset * 2, box_height + offset * 2), 
-                                   1)
+                border = self.effects.glow_border((box_width, box_height), GOLD, 3)
+                self.screen.blit(border, (x - 2, y - 2))
             else:
                 pygame.draw.rect(self.screen, (100, 100, 140), 
                                (x, y, box_width, box_height), 1)
@@ -740,11 +619,12 @@ class Game:
                 'SCOUT': '🏹',
                 'SHAMAN': '✨'
             }
+            info = CLASS_INFO[char_class]
             icon = class_icons.get(char_class.name, '')
-            name_text = f"{icon} {char_class.value[0]}"
-            name_shadow = self.menu_font.render(name_text, True, (0, 0, 0))
-            name_surface = self.menu_font.render(name_text, True, 
-                                               GOLD if is_selected else WHITE)
+            name_text = f"{icon} {info.name}"
+            name_shadow = self.text.render(self.menu_font, name_text, (0, 0, 0))
+            name_surface = self.text.render(self.menu_font, name_text,
+                                            GOLD if is_selected else WHITE)
             
             name_rect = name_surface.get_rect(center=(x + box_width//2, y + 30))
             self.screen.blit(name_shadow, (name_rect.x + 1, name_rect.y + 1))
@@ -752,22 +632,17 @@ class Game:
 
             # Draw character image or placeholder
             image_rect = pygame.Rect(x + 35, y + 60, 150, 150)
-            try:
-                image = pygame.image.load(f"assets/{char_class.name.lower()}.png")
-                image = pygame.transform.scale(image, (150, 150))
-                if not is_selected:
-                    dark = pygame.Surface(image.get_size()).convert_alpha()
-                    dark.fill((0, 0, 0, 100))
-                    image.blit(dark, (0, 0))
+            image = self.assets.get_portrait(char_class.name.lower(), is_selected)
+            if image is not None:
                 self.screen.blit(image, image_rect)
-            except:
+            else:
                 pygame.draw.rect(self.screen, (80, 80, 100), image_rect)
-                placeholder = self.menu_font.render(char_class.value[1], True, WHITE)
+                placeholder = self.text.render(self.menu_font, info.icon, WHITE)
                 placeholder_rect = placeholder.get_rect(center=image_rect.center)
                 self.screen.blit(placeholder, placeholder_rect)
 
             # Draw class description with better spacing
-            desc = char_class.value[2]
+            desc = info.summary
             desc_words = desc.split()
             desc_lines = []
             current_line = []
@@ -790,14 +665,13 @@ class Game:
             # Draw description with increased spacing
             desc_y = y + 230
             for line in desc_lines:
-                desc_surface = self.small_font.render(line, True, 
-                                                   WHITE if is_selected else GRAY)
+                desc_surface = self.text.render(self.small_font, line,
+                                                WHITE if is_selected else GRAY)
                 desc_rect = desc_surface.get_rect(center=(x + box_width//2, desc_y))
                 self.screen.blit(desc_surface, desc_rect)
                 desc_y += 25  # Increased line spacing
 
             # Draw stats bars with icons and better spacing
-            stats = char_class.value[3]
             stat_y = y + 320  # Moved down slightly
             stat_icons = {
                 'HP': '❤️',
@@ -806,12 +680,12 @@ class Game:
                 'SPD': '⚡'
             }
             
-            for stat, value in [('HP', stats['HP']), ('ATK', stats['ATK']), 
-                              ('DEF', stats['DEF']), ('SPD', stats['SPD'])]:
+            for stat, value in [('HP', info.hp), ('ATK', info.atk),
+                              ('DEF', info.def_), ('SPD', info.spd)]:
                 # Draw stat label with icon
                 icon = stat_icons[stat]
                 stat_text = f"{icon} {stat}"
-                text_surface = self.small_font.render(stat_text, True, WHITE)
+                text_surface = self.text.render(self.small_font, stat_text, WHITE)
                 self.screen.blit(text_surface, (x + 10, stat_y))
                 
                 # Draw stat bar
@@ -839,16 +713,16 @@ class Game:
 
             # Draw special ability with icon
             special_y = y + box_height - 40
-            special_text = f"✨ {stats['special']}"
-            special_surface = self.small_font.render(special_text, True,
-                                                   GOLD if is_selected else WHITE)
+            special_text = f"✨ {info.special}"
+            special_surface = self.text.render(self.small_font, special_text,
+                                               GOLD if is_selected else WHITE)
             special_rect = special_surface.get_rect(center=(x + box_width//2, special_y))
             self.screen.blit(special_surface, special_rect)
 
         # Draw controls with better visibility
         controls_text = "← → Select   |   Click or ENTER to Confirm   |   ESC Back"
-        controls_shadow = self.menu_font.render(controls_text, True, (0, 0, 0))
-        controls_surface = self.menu_font.render(controls_text, True, WHITE)
+        controls_shadow = self.text.render(self.menu_font, controls_text, (0, 0, 0))
+        controls_surface = self.text.render(self.menu_font, controls_text, WHITE)
         controls_rect = controls_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 30))
         self.screen.blit(controls_shadow, (controls_rect.x + 1, controls_rect.y + 1))
         self.screen.blit(controls_surface, controls_rect)
@@ -861,26 +735,25 @@ class Game:
         monster_info = f"{self.current_monster.name} {monster_symbol} Lvl.{self.current_monster.level}"
         
         # Try to render emoji with special font
-        monster_text = self.emoji_font.render(monster_info, True, WHITE)
+        monster_text = self.text.render(self.emoji_font, monster_info, WHITE)
         monster_rect = monster_text.get_rect(center=(WINDOW_WIDTH // 2, 50))
         self.screen.blit(monster_text, monster_rect)
         
         # Draw large monster emoji
-        large_emoji = self.emoji_font.render(monster_symbol, True, WHITE)
-        emoji_rect = large_emoji.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3))
-        scaled_emoji = pygame.transform.scale(large_emoji, (96, 96))
+        large_emoji = self.text.render(self.emoji_font, monster_symbol, WHITE)
+        scaled_emoji = self.effects.scaled((self.emoji_font, monster_symbol), large_emoji, (96, 96))
         scaled_rect = scaled_emoji.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3))
         self.screen.blit(scaled_emoji, scaled_rect)
         
         # Draw monster special ability
         ability_text = f"Special: {self.current_monster.special_ability}"
-        ability_surface = self.small_font.render(ability_text, True, GOLD)
+        ability_surface = self.text.render(self.small_font, ability_text, GOLD)
         ability_rect = ability_surface.get_rect(center=(WINDOW_WIDTH // 2, 80))
         self.screen.blit(ability_surface, ability_rect)
         
         # Draw monster HP with colored bar
         monster_hp = f"HP: {self.current_monster.hp}/{self.current_monster.max_hp}"
-        hp_text = self.menu_font.render(monster_hp, True, WHITE)
+        hp_text = self.text.render(self.menu_font, monster_hp, WHITE)
         hp_rect = hp_text.get_rect(center=(WINDOW_WIDTH // 2, 110))
         self.screen.blit(hp_text, hp_rect)
         
@@ -892,25 +765,29 @@ class Game:
         
         # Background
         pygame.draw.rect(self.screen, (50, 0, 0), (bar_x, bar_y, bar_width, bar_height))
-        # HP with gradient
+        # HP with gradient: a pre-built red-to-yellow bar clipped to the HP ratio
         hp_ratio = self.current_monster.hp / self.current_monster.max_hp
         hp_width = int(hp_ratio * bar_width)
-        for i in range(hp_width):
-            # Create a gradient from red to yellow based on HP percentage
-            color_ratio = i / bar_width
-            red = 200
-            green = int(150 * color_ratio)
-            pygame.draw.line(self.screen, (red, green, 0), 
-                            (bar_x + i, bar_y), (bar_x + i, bar_y + bar_height))
+        if hp_width > 0:
+            gradient = self.effects.horizontal_gradient((bar_width, bar_height + 1), (200, 0, 0), (200, 150, 0))
+            self.screen.blit(gradient, (bar_x, bar_y), (0, 0, hp_width, bar_height + 1))
         # Border
         pygame.draw.rect(self.screen, WHITE, (bar_x, bar_y, bar_width, bar_height), 1)
         
+        # The rest of the pack or summons waiting behind this one
+        others = len(self.battle.monsters) - 1 if self.battle else 0
+        if others:
+            others_text = f"+{others} more {'foe' if others == 1 else 'foes'}"
+            others_surface = self.text.render(self.small_font, others_text, WHITE)
+            others_rect = others_surface.get_rect(midleft=(bar_x + bar_width + 15, bar_y + bar_height // 2))
+            self.screen.blit(others_surface, others_rect)
+        
         # Draw player stats
         self.draw_header()
         
         # Draw combat message
         message_text = self.combat_message
-        message_surface = self.menu_font.render(message_text, True, GOLD)
+        message_surface = self.text.render(self.menu_font, message_text, GOLD)
         message_rect = message_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 50))
         self.screen.blit(message_surface, message_rect)
         
@@ -922,11 +799,12 @@ class Game:
             "Run": "<"
         }
         
+        special_cost = CLASS_SPECIALS[CharacterClass[self.selected_class]][0]
         for i, option in enumerate(self.combat_options):
             color = GOLD if i == self.combat_index else WHITE
             if option == "Special":
-                if self.player_stats['spirit'] >= 20:
-                    text = f"{option_icons[option]} {option} (20 Spirit)"
+                if self.player_stats.spirit >= special_cost:
+                    text = f"{option_icons[option]} {option} ({special_cost} Spirit)"
                 else:
                     text = f"{option_icons[option]} {option} (Not enough Spirit)"
                     color = GRAY
@@ -939,94 +817,232 @@ class Game:
             else:
                 text = "  " + text
         
-            option_text = self.menu_font.render(text, True, color)
+            option_text = self.text.render(self.menu_font, text, color)
             self.screen.blit(option_text, (50, WINDOW_HEIGHT - 200 + i * 40))
     
+        # Effects on the player
+        effects = self.battle.status.names(PLAYER) if self.battle else []
+        if effects:
+            effects_surface = self.text.render(self.small_font, ", ".join(effects), GOLD)
+            self.screen.blit(effects_surface, (WINDOW_WIDTH - 300, WINDOW_HEIGHT - 90))
+        
         # Draw turn indicator
         turn_text = ">> Your Turn" if self.combat_turn == "player" else ">> Enemy Turn"
-        turn_surface = self.menu_font.render(turn_text, True, GOLD)
+        turn_surface = self.text.render(self.menu_font, turn_text, GOLD)
         self.screen.blit(turn_surface, (WINDOW_WIDTH - 200, WINDOW_HEIGHT - 50))
 
     def draw_ending(self):
         self.screen.fill(BLACK)
         
         # Draw victory title with glow effect
-        title_text = "VICTORY!" if self.player_stats['hp'] > 0 else "HEROIC SACRIFICE!"
-        for offset in range(3):
-            glow_alpha = 255 - (offset * 60)
-            glow_surface = self.title_font.render(title_text, True, (*GOLD, glow_alpha))
-            glow_rect = glow_surface.get_rect(center=(WINDOW_WIDTH // 2 + offset, WINDOW_HEIGHT // 4 + offset))
-            self.screen.blit(glow_surface, glow_rect)
-        
-        title_surface = self.title_font.render(title_text, True, GOLD)
-        title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 4))
-        self.screen.blit(title_surface, title_rect)
+        title_text = "VICTORY!" if self.player_stats.hp > 0 else "HEROIC SACRIFICE!"
+        title_rect = self.text.get_rect(self.title_font, title_text, center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 4))
+        self.screen.blit(self.effects.glow_text(self.text, self.title_font, title_text, GOLD), title_rect)
         
         # Draw player stats
         stats_text = [
             f"Hero: {self.character_name}",
             f"Class: {self.selected_class}",
-            f"Level: {self.player_stats['level']}",
-            f"Final HP: {max(0, self.player_stats['hp'])}/{self.player_stats['max_hp']}",
-            f"Attack: {self.player_stats['atk']}",
-            f"Defense: {self.player_stats['def']}",
+            f"Level: {self.player_stats.level}",
+            f"Final HP: {max(0, self.player_stats.hp)}/{self.player_stats.max_hp}",
+            f"Attack: {self.player_stats.atk}",
+            f"Defense: {self.player_stats.def_}",
             "Press ENTER to return to main menu"
         ]
         
         # Add special message for dying while winning
-        if self.player_stats['hp'] <= 0:
+        if self.player_stats.hp <= 0:
             stats_text.insert(-1, "You defeated the boss at the cost of your life!")
         
         for i, text in enumerate(stats_text):
-            text_surface = self.menu_font.render(text, True, WHITE)
+            text_surface = self.text.render(self.menu_font, text, WHITE)
             text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + i * 40))
             self.screen.blit(text_surface, text_rect)
 
+    def handle_event(self, event):
+        if self.recorder is not None:
+            self.recorder.record(self.scheduler.steps, event)
+        if event.type not in PASSIVE_EVENTS:
+            self.needs_redraw = True
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.show_profiler = not self.show_profiler
+            return
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+            self.quickload()
+            return
+        if self.state in (GameState.GAME_BOARD, GameState.COMBAT) and event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F5:
+                self.quicksave()
+                return
+            if event.key == pygame.K_BACKSPACE:
+                self.rewind()
+                return
+
+        if self.state == GameState.MAIN_MENU:
+            self.handle_main_menu_input(event)
+        elif self.state == GameState.SETTINGS:
+            self.handle_settings_input(event)
+        elif self.state == GameState.CHARACTER_SELECT:
+            self.handle_character_select_input(event)
+        elif self.state == GameState.GAME_BOARD:
+            self.handle_game_board_input(event)
+        elif self.state == GameState.COMBAT:
+            self.handle_combat_input(event)
+        elif self.state == GameState.ENDING:
+            self.handle_ending_input(event)
+
+    def draw(self):
+        # Clear screen
+        self.screen.fill(BLACK)
+
+        # Draw current state
+        if self.state == GameState.MAIN_MENU:
+            self.draw_main_menu()
+        elif self.state == GameState.SETTINGS:
+            self.draw_settings()
+        elif self.state == GameState.CHARACTER_SELECT:
+            self.draw_character_select()
+        elif self.state == GameState.GAME_BOARD:
+            self.draw_game_board()
+        elif self.state == GameState.COMBAT:
+            self.draw_combat()
+        elif self.state == GameState.ENDING:
+            self.draw_ending()
+
+        if not self.loader.finished:
+            self.draw_loading_bar()
+
+    def draw_loading_bar(self):
+        # Thin progress bar along the bottom edge while assets are still loading
+        width = int(WINDOW_WIDTH * self.loader.progress)
+        pygame.draw.rect(self.screen, (30, 30, 30), (0, WINDOW_HEIGHT - 4, WINDOW_WIDTH, 4))
+        pygame.draw.rect(self.screen, GOLD, (0, WINDOW_HEIGHT - 4, width, 4))
+
+    def draw_profiler_overlay(self):
+        # p50/p95/p99 busy frame time per state, from the profiler ring buffer
+        lines = ["Frame ms      p50    p95    p99"]
+        for state_value, (p50, p95, p99, _) in sorted(self.profiler.summary().items()):
+            name = GameState(state_value).name[:12]
+            lines.append(f"{name:12s} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+
+        width = 300
+        height = 10 + len(lines) * 20
+        panel = self.assets.get_overlay((width, height), BLACK, 180)
+        x = WINDOW_WIDTH - width - 10
+        self.screen.blit(panel, (x, 10))
+        for i, line in enumerate(lines):
+            surface = self.text.render(self.small_font, line, GOLD if i == 0 else WHITE)
+            self.screen.blit(surface, (x + 10, 15 + i * 20))
+
+    def animated_rects(self):
+        # Screen areas that change without any input: just the boss pulse
+        if self.state != GameState.GAME_BOARD or self.board_renderer is None:
+            return []
+        rect = self.board_renderer.animated_rect(self.screen.get_size())
+        if rect is None:
+            return []
+        rect = rect.clip(BOARD_VIEW)  # Header and action bar are drawn over the board
+        return [rect] if rect else []
+
+    def is_animating(self):
+        # Pending timers count too: the loop has to keep advancing game time for them
+        return (self.show_profiler or self.scheduler.pending() or not self.loader.finished
+                or bool(self.animated_rects()))
+
+    def render_frame(self):
+        """Draw this frame and return the dirty rects ([] if nothing changed)"""
+        if self.render_mode == "continuous" or self.needs_redraw or self.show_profiler:
+            self.needs_redraw = False
+            self.draw()
+            if self.show_profiler:
+                self.draw_profiler_overlay()
+            return [self.screen.get_rect()]
+
+        rects = self.animated_rects()
+        if rects:
+            # Repaint the board under the pulse (chunks, boss, fog) clipped to it
+            self.screen.set_clip(rects[0])
+            self.screen.fill(BLACK)
+            self.board_renderer.draw(self.screen, self.scheduler.ticks)
+            self.screen.set_clip(None)
+            self.draw_path_preview(self.board_renderer, rects[0])  # Dots the pulse painted over
+        return rects
+
     def run(self):
+        profiler = self.profiler
         running = True
+        last = time.perf_counter()
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.USEREVENT:  # Monster turn timer
-                    if self.state == GameState.COMBAT and self.combat_turn == "monster":
-                        self.handle_monster_turn()
-                
-                if self.state == GameState.MAIN_MENU:
-                    self.handle_main_menu_input(event)
-                elif self.state == GameState.SETTINGS:
-                    self.handle_settings_input(event)
-                elif self.state == GameState.CHARACTER_SELECT:
-                    self.handle_character_select_input(event)
-                elif self.state == GameState.GAME_BOARD:
-                    self.handle_game_board_input(event)
-                elif self.state == GameState.COMBAT:
-                    self.handle_combat_input(event)
-                elif self.state == GameState.ENDING:
-                    self.handle_ending_input(event)
-            
-            # Clear screen
-            self.screen.fill(BLACK)
-            
-            # Draw current state
-            if self.state == GameState.MAIN_MENU:
-                self.draw_main_menu()
-            elif self.state == GameState.SETTINGS:
-                self.draw_settings()
-            elif self.state == GameState.CHARACTER_SELECT:
-                self.draw_character_select()
-            elif self.state == GameState.GAME_BOARD:
-                self.draw_game_board()
-            elif self.state == GameState.COMBAT:
-                self.draw_combat()
-            elif self.state == GameState.ENDING:
-                self.draw_ending()
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            events = []
+            if self.render_mode == "idle" and not self.needs_redraw and not self.is_animating():
+                # Nothing to draw until something happens; the timeout only bounds the sleep
+                events.append(pygame.event.wait(IDLE_WAIT_MS))
+
+            profiler.begin_frame()
+            with profiler.timed('events'):
+                for event in events + pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    self.handle_event(event)
+
+            if self.loader.poll():
+                self.needs_redraw = True
 
+            # Fixed-step game time catches up with the real time since the last frame
+            now = time.perf_counter()
+            with profiler.timed('update'):
+                self.scheduler.advance(now - last)
+            last = now
+
+            with profiler.timed('draw'):
+                rects = self.render_frame()
+            if rects:
+                with profiler.timed('flip'):
+                    if rects[0] == self.screen.get_rect():
+                        pygame.display.flip()
+                    else:
+                        pygame.display.update(rects)
+                profiler.end_frame(self.state.value)  # Skipped frames stay out of the stats
+            self.clock.tick(self.fps)
+
+        if self.recorder is not None:
+            self.recorder.close()
+        self.loader.wait()  # The worker must not touch pygame after quit
+        if self.sim.prefetcher is not None:
+            self.sim.prefetcher.close()
+        if self.profile_dump:
+            profiler.dump(self.profile_dump, {state.value: state.name for state in GameState})
         pygame.quit()
 
-if __name__ == "__main__":
-    game = Game()
+def seed_arg(text):
+    # Larger or negative seeds would fail later, in the board RNG or when packing a save
+    seed = int(text)
+    if not 0 <= seed < SEED_LIMIT:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {SEED_LIMIT - 1}")
+    return seed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dungeo")
+    parser.add_argument('--seed', type=seed_arg, default=None,
+                        help="play a fixed, reproducible dungeon (e.g. the daily challenge)")
+    parser.add_argument('--profile-dump', metavar='PATH', default=None,
+                        help="write per-frame timings to PATH (.csv or .json) on exit")
+    parser.add_argument('--render-mode', choices=RENDER_MODES, default="continuous",
+                        help="idle: redraw only on input or animation, sleeping otherwise")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="render frame cap (0 = uncapped); game speed doesn't depend on it")
+    parser.add_argument('--vsync', action='store_true', help="sync frames to the display refresh")
+    parser.add_argument('--record', metavar='PATH', default=None,
+                        help="record input to PATH for replay.py")
+    parser.add_argument('--save', metavar='PATH', default=None,
+                        help="quicksave file for F5/F9 (default: $DUNGEO_SAVE or ~/.local/share/dungeo)")
+    parser.add_argument('--no-audio', action='store_true', help="don't open an audio device")
+    args = parser.parse_args(argv)
+
+    game = Game(seed=args.seed, profile_dump=args.profile_dump, render_mode=args.render_mode,
+                fps=args.fps, vsync=args.vsync, record=args.record, save_path=args.save,
+                audio=not args.no_audio)
     game.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+import pygame
+
+
+class Effects:
+    """Gradients and glows built once with NumPy, then just blitted every frame"""
+
+    def __init__(self):
+        self.surfaces = {}
+
+    def _cached(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = build()
+            self.surfaces[key] = surface
+        return surface
+
+    def horizontal_gradient(self, size, start_color, end_color):
+        # Opaque left-to-right gradient; callers blit a prefix of it (e.g. HP bars)
+        def build():
+            width, height = size
+            t = np.arange(width, dtype=np.float64) / width
+            start = np.array(start_color, dtype=np.float64)
+            end = np.array(end_color, dtype=np.float64)
+            column = (start + (end - start) * t[:, None]).astype(np.uint8)  # Truncates like int()
+            surface = pygame.Surface(size).convert()
+            pygame.surfarray.blit_array(surface, np.repeat(column[:, None, :], height, axis=1))
+            return surface
+        return self._cached(('hgrad', size, start_color, end_color), build)
+
+    def vertical_alpha_gradient(self, size, color, alpha_top, alpha_bottom):
+        # Flat color whose alpha fades from top to bottom
+        def build():
+            width, height = size
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            surface.fill((*color, 255))
+            alpha = alpha_top + (np.arange(height) / height) * (alpha_bottom - alpha_top)
+            pixels = pygame.surfarray.pixels_alpha(surface)
+            pixels[:] = alpha.astype(np.uint8)[None, :]
+            del pixels  # Unlock the surface
+            return surface
+        return self._cached(('vgrad', size, color, alpha_top, alpha_bottom), build)
+
+    def glow_border(self, size, color, layers=3, falloff=60):
+        # Nested 1px outlines fading outwards; blit at (x - layers + 1, y - layers + 1)
+        def build():
+            width, height = size
+            pad = layers - 1
+            surface = pygame.Surface((width + pad * 2, height + pad * 2), pygame.SRCALPHA).convert_alpha()
+            for offset in range(layers):
+                pygame.draw.rect(surface, (*color, 255 - offset * falloff),
+                                 (pad - offset, pad - offset, width + offset * 2, height + offset * 2), 1)
+            return surface
+        return self._cached(('border', size, color, layers, falloff), build)
+
+    def glow_text(self, text_cache, font, text, color, layers=3, falloff=60):
+        # Text over fading copies shifted down-right; blit with the anchor of the plain text
+        def build():
+            base = text_cache.render(font, text, color)
+            width, height = base.get_size()
+            surface = pygame.Surface((width + layers - 1, height + layers - 1), pygame.SRCALPHA).convert_alpha()
+            for offset in reversed(range(layers)):
+                copy = base.copy()
+                copy.set_alpha(255 - offset * falloff)
+                surface.blit(copy, (offset, offset))
+            surface.blit(base, (0, 0))
+            return surface
+        return self._cached(('glowtext', font, text, color, layers, falloff), build)
+
+    def scaled(self, surface_key, surface, size):
+        # Scaled copies of surfaces that would otherwise be rescaled each frame
+        return self._cached(('scaled', surface_key, size),
+                            lambda: pygame.transform.scale(surface, size))
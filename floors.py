@@ -0,0 +1,127 @@
+"""Floors of a multi-level dungeon, and storage for the ones the player left.
+
+Every floor is an ordinary generated GameBoard. prepare_floor turns it into
+a floor: the room the boss would get becomes the stairs down (except on the
+bottom floor), and on deeper floors the player arrives on stairs up.
+
+FloorStore keeps left floors so they come back as they were left. Each is
+packed into one byte per tile (type and flags together; chars are derived
+from the type). The most recently used floors stay in memory. Older ones
+are spilled to a memory-mapped scratch file, so a long run uses a flat
+amount of memory and the OS pages floors in only when they're revisited.
+"""
+import tempfile
+from collections import OrderedDict
+import numpy as np
+from board import GameBoard, TileType, TYPE_CHAR
+
+MAX_RESIDENT_FLOORS = 8  # Packed floors kept in memory before spilling to disk
+TYPE_BITS = 4            # Low bits of a packed tile hold the type, the rest its flags
+TYPE_MASK = (1 << TYPE_BITS) - 1
+
+
+def prepare_floor(board, depth, bottom):
+    # Stairs down replace the boss room above the bottom floor
+    if not bottom and board.boss_pos is not None:
+        board.replace_tile(*board.boss_pos, TileType.STAIRS_DOWN)
+        board.stairs_pos = board.boss_pos
+        board.boss_pos = None
+    if depth > 0:
+        board.replace_tile(*board.player_pos, TileType.STAIRS_UP)
+    board.dirty_tiles.clear()  # Nothing has drawn this board yet
+    return board
+
+
+def pack(board):
+    return (board.types | (board.flags << TYPE_BITS)).ravel()
+
+
+def unpack(packed, meta):
+    width, height, player_pos, boss_pos, seed = meta
+    packed = np.asarray(packed).reshape(height, width)
+    types = packed & TYPE_MASK
+    return GameBoard.from_arrays(types, TYPE_CHAR[types], packed >> TYPE_BITS,
+                                 player_pos, boss_pos, seed=seed)
+
+
+class FloorStore:
+    """Left floors by key, newest in memory, the rest spilled to a memory map"""
+
+    def __init__(self, max_resident=MAX_RESIDENT_FLOORS):
+        self.max_resident = max_resident
+        self.resident = OrderedDict()  # key -> (packed tiles, meta)
+        self.spilled = {}              # key -> (slot in the spill file, meta)
+        self.spill = None              # (slots, tiles) uint8 memmap, created on first spill
+        self.spill_file = None
+        self.free_slots = []
+
+    def __len__(self):
+        return len(self.resident) + len(self.spilled)
+
+    def __contains__(self, key):
+        return key in self.resident or key in self.spilled
+
+    def put(self, key, board):
+        meta = (board.width, board.height, board.player_pos, board.boss_pos, board.seed)
+        self.discard(key)
+        self.resident[key] = (pack(board), meta)
+        while len(self.resident) > self.max_resident:
+            self._spill(*self.resident.popitem(last=False))
+
+    def take(self, key):
+        # The stored floor as a board (removed from the store), or None
+        entry = self.resident.pop(key, None)
+        if entry is not None:
+            return unpack(*entry)
+        entry = self.spilled.pop(key, None)
+        if entry is not None:
+            slot, meta = entry
+            self.free_slots.append(slot)
+            return unpack(self.spill[slot, :meta[0] * meta[1]], meta)
+        return None
+
+    def entries(self):
+        # (key, packed tiles, meta) of every stored floor, least recently used
+        # first, without taking them out (see savegame)
+        for key, (slot, meta) in self.spilled.items():
+            yield key, self.spill[slot, :meta[0] * meta[1]], meta
+        for key, (packed, meta) in self.resident.items():
+            yield key, packed, meta
+
+    def discard(self, key):
+        self.resident.pop(key, None)
+        entry = self.spilled.pop(key, None)
+        if entry is not None:
+            self.free_slots.append(entry[0])
+
+    def clear(self):
+        self.resident.clear()
+        self.spilled.clear()
+        self.free_slots = list(range(len(self.spill))) if self.spill is not None else []
+
+    def _spill(self, key, entry):
+        packed, meta = entry
+        if self.spill is not None and len(packed) > self.spill.shape[1]:
+            self._grow(len(self.spill), len(packed))
+        if not self.free_slots:
+            self._grow(max(self.max_resident, 2 * len(self.spill) if self.spill is not None else 0),
+                       len(packed))
+        slot = self.free_slots.pop()
+        self.spill[slot, :len(packed)] = packed
+        self.spilled[key] = (slot, meta)
+
+    def _grow(self, slots, tiles):
+        # Re-map the scratch file with room for more (or bigger) floors
+        old = self.spill
+        old_slots, old_tiles = old.shape if old is not None else (0, 0)
+        tiles = max(tiles, old_tiles)
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(prefix='dungeo-floors-')
+        kept = np.array(old) if old is not None and tiles != old_tiles else None
+        self.spill = None
+        del old
+        self.spill_file.truncate(slots * tiles)
+        self.spill = np.memmap(self.spill_file, dtype=np.uint8, mode='r+', shape=(slots, tiles))
+        if kept is not None:
+            self.spill[:old_slots, :old_tiles] = kept
+        self.free_slots.extend(range(old_slots, slots))
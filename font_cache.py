@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import pygame
+
+DEFAULT_FONT_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'dungeo', 'fonts.json')
+
+
+class FontCache:
+    """Remembers where system fonts live, so later launches skip pygame's font scan
+
+    pygame.font.match_font enumerates every installed font (fc-list on Linux)
+    the first time it's called. The resolved path, or "not installed", is
+    kept on disk; entries pointing at files that have since gone are looked
+    up again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('DUNGEO_FONT_CACHE', DEFAULT_FONT_CACHE)
+        self.paths = self.read()
+        self.changed = False
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                paths = json.load(f)
+            return paths if isinstance(paths, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def resolve(self, name):
+        # File path of an installed font, or None
+        path = self.paths.get(name, False)
+        if path is None or (path and os.path.exists(path)):
+            return path
+        path = pygame.font.match_font(name)
+        self.paths[name] = path
+        self.changed = True
+        return path
+
+    def find(self, names):
+        # First installed font out of a list of candidates
+        for name in names:
+            path = self.resolve(name)
+            if path:
+                return path
+        return None
+
+    def save(self):
+        if not self.changed:
+            return
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.paths, f)
+            os.replace(tmp_path, self.path)
+            self.changed = False
+        except OSError:
+            pass  # Without a writable cache the scan just happens again next launch
@@ -0,0 +1,126 @@
+"""Field of view on the hex board.
+
+For a light radius, the hex line from the viewer to every hex within range
+is worked out once and kept as a plan of flat index offsets into the board
+arrays. A FOV query adds the viewer's index to the whole plan, looks up
+every hex on every ray at once with NumPy and keeps the targets with a
+clear ray, so no Python code runs per tile. Walls block what's behind them
+but are visible themselves.
+
+Each target gets two lines, nudged to either side, so a line running exactly
+between two hexes is only blocked if both ways past are. The two are mostly
+identical and then stored once.
+"""
+from functools import lru_cache
+import numpy as np
+import hexgrid
+
+NUDGE = 1e-6
+
+
+def _cube_round(q, r):
+    s = -q - r
+    rq = np.rint(q)
+    rr = np.rint(r)
+    rs = np.rint(s)
+    dq = np.abs(rq - q)
+    dr = np.abs(rr - r)
+    ds = np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+@lru_cache(maxsize=8)
+def hex_lines(radius):
+    """Axial offsets of the hexes in range and of the lines leading to them
+
+    Returns (target_q, target_r, rays): rays is a list of (target, q, r)
+    giving the hexes strictly between the viewer and that target. Targets
+    next to the viewer have no rays; they are always visible.
+    """
+    span = np.arange(-radius, radius + 1)
+    q, r = np.meshgrid(span, span, indexing='ij')
+    q = q.ravel()
+    r = r.ravel()
+    keep = np.maximum(np.maximum(np.abs(q), np.abs(r)), np.abs(q + r)) <= radius
+    target_q = q[keep]
+    target_r = r[keep]
+    distance = np.maximum(np.maximum(np.abs(target_q), np.abs(target_r)), np.abs(target_q + target_r))
+
+    rays = []
+    for target in np.flatnonzero(distance > 1):
+        n = int(distance[target])
+        t = np.arange(1, n) / n
+        seen = None
+        for nudge in (NUDGE, -NUDGE):
+            line = _cube_round((target_q[target] + nudge) * t, (target_r[target] + nudge) * t)
+            key = (tuple(line[0]), tuple(line[1]))
+            if key != seen:
+                rays.append((target, line[0], line[1]))
+                seen = key
+    return target_q, target_r, rays
+
+
+@lru_cache(maxsize=16)
+def _plan(radius, parity, width):
+    # hex_lines in offset coordinates for a viewer in an even or odd column,
+    # plus flat index offsets for a board of this width
+    target_q, target_r, rays = hex_lines(radius)
+    tx, ty = hexgrid.axial_to_offset(target_q + parity, target_r)
+    ty = ty - hexgrid.axial_to_offset(parity, 0)[1]
+    tx = tx - parity
+
+    owner = np.array([target for target, _, _ in rays], dtype=np.int64)
+    lengths = np.array([len(q) for _, q, _ in rays], dtype=np.int64)
+    q = np.concatenate([q for _, q, _ in rays] or [np.zeros(0, dtype=np.int64)])
+    r = np.concatenate([r for _, _, r in rays] or [np.zeros(0, dtype=np.int64)])
+    cx, cy = hexgrid.axial_to_offset(q + parity, r)
+    cy = cy - hexgrid.axial_to_offset(parity, 0)[1]
+    cx = cx - parity
+
+    ray_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # Rays are listed target by target; where each target's rays begin
+    first_ray = np.flatnonzero(np.diff(owner, prepend=-1))
+    return {
+        'tx': tx, 'ty': ty, 'target_index': ty * width + tx,
+        'cx': cx, 'cy': cy, 'cell_index': cy * width + cx,
+        'ray_starts': ray_starts, 'first_ray': first_ray, 'ray_target': owner[first_ray],
+    }
+
+
+def visible_tiles(opaque, viewer, radius):
+    """Flat indices of the tiles visible from viewer within radius
+
+    opaque is a (height, width) bool array of tiles that block sight.
+    """
+    height, width = opaque.shape
+    x, y = int(viewer[0]), int(viewer[1])
+    plan = _plan(radius, x & 1, width)
+    origin = y * width + x
+    flat = opaque.ravel()
+
+    if radius <= x < width - radius and radius <= y < height - radius:
+        # The whole light radius is on the board: no bounds checks needed
+        blocked = flat[plan['cell_index'] + origin]
+        on_board = None
+    else:
+        cx = plan['cx'] + x
+        cy = plan['cy'] + y
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        blocked = np.zeros(len(cx), dtype=bool)
+        blocked[inside] = flat[(cy * width + cx)[inside]]
+        tx = plan['tx'] + x
+        ty = plan['ty'] + y
+        on_board = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+
+    visible = np.ones(len(plan['target_index']), dtype=bool)
+    if len(blocked):
+        # A ray is blocked if any hex on it is; a target is hidden if all its rays are
+        ray_blocked = np.logical_or.reduceat(blocked, plan['ray_starts'])
+        visible[plan['ray_target']] = ~np.logical_and.reduceat(ray_blocked, plan['first_ray'])
+    if on_board is not None:
+        visible &= on_board
+    return plan['target_index'][visible] + origin
@@ -0,0 +1,137 @@
+"""Geometry and adjacency of the board's hex grid.
+
+The board is an "odd-q" offset grid: tiles sit in columns, and odd columns are
+shifted down by half a row. Offset (x, y) coordinates index the board arrays;
+axial (q, r) / cube (q, r, s) coordinates make distances and directions simple
+arithmetic. Functions taking coordinates accept plain ints or NumPy arrays.
+Nothing here imports pygame.
+"""
+import math
+from functools import lru_cache
+import numpy as np
+
+# Neighbor (dx, dy) in offset coordinates, indexed by column parity, listed
+# clockwise from the upper-right neighbor. (x +- 1, y) and (x, y +- 1) are
+# neighbors in both parities, so arrow-key moves are always hex moves
+OFFSET_NEIGHBORS = (
+    ((1, -1), (1, 0), (0, 1), (-1, 0), (-1, -1), (0, -1)),  # Even columns
+    ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (0, -1)),    # Odd columns
+)
+# The same six directions in axial and cube coordinates
+AXIAL_DIRECTIONS = ((1, -1), (1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1))
+CUBE_DIRECTIONS = tuple((q, r, -q - r) for q, r in AXIAL_DIRECTIONS)
+
+# Per-parity offsets as arrays, for building index tables
+_NEIGHBOR_DX = np.array([[dx for dx, _ in row] for row in OFFSET_NEIGHBORS], dtype=np.int32)
+_NEIGHBOR_DY = np.array([[dy for _, dy in row] for row in OFFSET_NEIGHBORS], dtype=np.int32)
+
+
+def offset_to_axial(x, y):
+    return x, y - (x - (x & 1)) // 2
+
+
+def axial_to_offset(q, r):
+    return q, r + (q - (q & 1)) // 2
+
+
+def offset_to_cube(x, y):
+    q, r = offset_to_axial(x, y)
+    return q, r, -q - r
+
+
+def distance(x0, y0, x1, y1):
+    # Steps between two tiles, in offset coordinates
+    q0, r0 = offset_to_axial(x0, y0)
+    q1, r1 = offset_to_axial(x1, y1)
+    dq = q0 - q1
+    dr = r0 - r1
+    if isinstance(dq, np.ndarray):
+        return np.maximum(np.maximum(np.abs(dq), np.abs(dr)), np.abs(dq + dr))
+    return max(abs(dq), abs(dr), abs(dq + dr))
+
+
+def neighbors(x, y):
+    # Offset coordinates of the six tiles around (x, y), which may be off the board
+    return [(x + dx, y + dy) for dx, dy in OFFSET_NEIGHBORS[x & 1]]
+
+
+def is_neighbor(x, dx, dy):
+    return (dx, dy) in OFFSET_NEIGHBORS[x & 1]
+
+
+def neighbor_table(width, height):
+    """(height * width, 6) int32 flat indices of each tile's neighbors, -1 off the board
+
+    Row i belongs to tile (i % width, i // width); columns follow
+    OFFSET_NEIGHBORS. Flat indices let movement, FOV and pathfinding gather
+    neighbors straight out of the board arrays.
+    """
+    # Built one column parity at a time on a (height, width, 6) view
+    table = np.empty((height, width, 6), dtype=np.int32)
+    ys = np.arange(height, dtype=np.int32)[:, None, None]
+    for parity in (0, 1):
+        xs = np.arange(parity, width, 2, dtype=np.int32)[None, :, None]
+        nx = xs + _NEIGHBOR_DX[parity]
+        ny = ys + _NEIGHBOR_DY[parity]
+        block = ny * width + nx
+        block[((nx < 0) | (nx >= width)) | ((ny < 0) | (ny >= height))] = -1
+        table[:, parity::2] = block
+    return table.reshape(height * width, 6)
+
+
+@lru_cache(maxsize=None)
+def hex_offsets(radius):
+    # Corner offsets of the hex stamp, computed once per radius
+    return tuple((radius * math.cos(math.radians(i * 60 - 30)),
+                  radius * math.sin(math.radians(i * 60 - 30))) for i in range(6))
+
+
+class HexLayout:
+    """Pixel positions of tile centers, with tile (0, 0) centered on the origin"""
+
+    def __init__(self, tile_size):
+        self.col_width = tile_size * 0.75
+        self.row_height = tile_size
+        self.shift = tile_size // 2  # Odd columns sit this much lower
+
+    def center(self, x, y):
+        px = x * self.col_width
+        py = y * self.row_height + (x & 1) * self.shift
+        return px, py
+
+    def pick(self, px, py):
+        """Tile whose center is nearest to a board-space point (arrays welcome)
+
+        The nearest center is found among the two columns either side of the
+        point, so the cost is constant however big the board is.
+        """
+        if not isinstance(px, np.ndarray) and not isinstance(py, np.ndarray):
+            return self._pick_one(px, py)
+        px = np.asarray(px, dtype=np.float64)
+        py = np.asarray(py, dtype=np.float64)
+        left = np.floor(px / self.col_width).astype(np.int64)
+        best_x = best_y = best_d = None
+        for x in (left, left + 1):
+            y = np.rint((py - (x & 1) * self.shift) / self.row_height).astype(np.int64)
+            cx, cy = self.center(x, y)
+            d = (px - cx) ** 2 + (py - cy) ** 2
+            if best_d is None:
+                best_x, best_y, best_d = x, y, d
+            else:
+                closer = d < best_d
+                best_x = np.where(closer, x, best_x)
+                best_y = np.where(closer, y, best_y)
+                best_d = np.where(closer, d, best_d)
+        return best_x, best_y
+
+    def _pick_one(self, px, py):
+        # Same as pick() for a single point, without NumPy's per-call overhead
+        left = math.floor(px / self.col_width)
+        best = None
+        for x in (left, left + 1):
+            y = round((py - (x & 1) * self.shift) / self.row_height)
+            cx, cy = self.center(x, y)
+            d = (px - cx) ** 2 + (py - cy) ** 2
+            if best is None or d < best[0]:
+                best = (d, x, y)
+        return best[1], best[2]
@@ -0,0 +1,70 @@
+"""Turn order for battles with any number of combatants.
+
+Each combatant waits TURN_LENGTH // SPD time units between turns, so one
+with twice the SPD acts twice as often. The order is a binary heap of
+(next turn, tiebreak, id): taking a turn pops the earliest entry and pushes
+it back one wait later, O(log n) however many units are fighting. Removing
+a unit only forgets its wait; its old entry is skipped when it surfaces.
+Times are integers, so the order is exact and replays identically.
+"""
+import heapq
+
+TURN_LENGTH = 1000
+
+
+class Initiative:
+    def __init__(self):
+        self.heap = []
+        self.waits = {}  # id -> time between its turns, for units still in the fight
+        self.sequence = 0  # Tiebreak: units due at the same time go in the order they were queued
+        self.now = 0
+
+    def __len__(self):
+        return len(self.waits)
+
+    def __contains__(self, uid):
+        return uid in self.waits
+
+    def add(self, uid, spd, first_turn=None):
+        # First turn one wait from now unless given. Ids must not be reused
+        wait = max(1, TURN_LENGTH // max(1, spd))
+        self.waits[uid] = wait
+        self._push(self.now + wait if first_turn is None else first_turn, uid)
+
+    def remove(self, uid):
+        self.waits.pop(uid, None)
+
+    def _push(self, time, uid):
+        heapq.heappush(self.heap, (time, self.sequence, uid))
+        self.sequence += 1
+
+    def _drop_stale(self):
+        heap = self.heap
+        while heap and heap[0][2] not in self.waits:
+            heapq.heappop(heap)
+
+    def peek(self):
+        # Who acts next, without taking the turn (None once everyone is gone)
+        self._drop_stale()
+        return self.heap[0][2] if self.heap else None
+
+    def next(self):
+        # Take the next turn: returns who acts and queues their following turn
+        self._drop_stale()
+        if not self.heap:
+            return None
+        time, _, uid = heapq.heappop(self.heap)
+        self.now = time
+        self._push(time + self.waits[uid], uid)
+        return uid
+
+    def entries(self):
+        # Queued turns of the units still fighting, as (time, tiebreak, id), for saving
+        return sorted(entry for entry in self.heap if entry[2] in self.waits)
+
+    def load(self, now, sequence, entries, waits):
+        # Inverse of entries(): rebuild the queue from saved turns and each unit's wait
+        self.now = now
+        self.sequence = sequence
+        self.waits = dict(waits)
+        self.heap = sorted(entries)
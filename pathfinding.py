@@ -0,0 +1,186 @@
+"""Shortest paths over the hex board for click-to-move.
+
+Two tools share one set of buffers allocated per board:
+
+- find_path: A* with a binary heap (heapq) for a single start/goal query.
+- distance_field: step counts from one tile to everything within a radius,
+  computed breadth-first with NumPy (every step costs the same, so this is
+  Dijkstra). It is cached until the start or the board changes, so hover
+  previews are a lookup plus a walk back along the field.
+
+Walls are never entered. Known monsters and unrevealed tiles can be avoided
+on request; the goal tile itself is always allowed, so clicking a monster
+still walks up to it and starts the fight.
+"""
+import heapq
+import numpy as np
+import hexgrid
+from board import TileType, REVEALED
+
+FIELD_RADIUS = 24  # Steps covered by the cached distance field (a screen is ~10 across)
+
+
+class Pathfinder:
+    def __init__(self, board):
+        self.board = board
+        self.width = board.width
+        n = board.width * board.height
+        # A* state, reused across queries. A tile's g/parent values are only
+        # valid if its stamp matches the current query, so nothing is cleared
+        self.g = np.zeros(n, dtype=np.int32)
+        self.parent = np.zeros(n, dtype=np.int32)
+        self.stamp = np.zeros(n, dtype=np.uint32)
+        self.query = 0
+        # Distance field: -1 = not reached; touched lists what to reset next time
+        self.dist = np.full(n, -1, dtype=np.int32)
+        self.touched = np.zeros(0, dtype=np.int64)
+        self.field_key = None
+        self.masks = {}
+        # Flat index deltas of the six neighbors for even and odd columns
+        self.deltas = [[dy * self.width + dx for dx, dy in row] for row in hexgrid.OFFSET_NEIGHBORS]
+
+    def walkable(self, avoid_unrevealed=False, avoid_monsters=False):
+        """Flat bool array of tiles a path may cross, cached per board revision
+
+        avoid_monsters only avoids monsters the player has already found.
+        """
+        key = (avoid_unrevealed, avoid_monsters)
+        cached = self.masks.get(key)
+        if cached is not None and cached[0] == self.board.revision:
+            return cached[1]
+        types = self.board.types.ravel()
+        mask = types != TileType.WALL.value
+        if avoid_unrevealed or avoid_monsters:
+            revealed = (self.board.flags.ravel() & REVEALED).astype(bool)
+            if avoid_unrevealed:
+                mask &= revealed
+            if avoid_monsters:
+                mask &= ~(revealed & (types == TileType.MONSTER.value))
+        self.masks[key] = (self.board.revision, mask)
+        return mask
+
+    def find_path(self, start, goal, avoid_unrevealed=False, avoid_monsters=False):
+        """Tiles from start (exclusive) to goal (inclusive), or None if unreachable"""
+        w = self.width
+        h = self.board.height
+        gx, gy = goal
+        if not (0 <= gx < w and 0 <= gy < h) or self.board.types[gy, gx] == TileType.WALL.value:
+            return None
+        if tuple(start) == tuple(goal):
+            return []
+        walkable = self.walkable(avoid_unrevealed, avoid_monsters)
+        start_i = start[1] * w + start[0]
+        goal_i = gy * w + gx
+
+        self.query += 1
+        query = self.query
+        # memoryviews make the per-node reads and writes plain Python indexing
+        g = memoryview(self.g)
+        parent = memoryview(self.parent)
+        stamp = memoryview(self.stamp)
+        passable = memoryview(walkable.view(np.uint8))
+        gq, gr = hexgrid.offset_to_axial(gx, gy)
+
+        g[start_i] = 0
+        parent[start_i] = -1
+        stamp[start_i] = query
+        heap = [(0, 0, start_i)]
+        while heap:
+            _, cost, i = heapq.heappop(heap)
+            if i == goal_i:
+                return self._trace(goal_i)
+            if cost > g[i]:
+                continue  # Stale heap entry
+            y, x = divmod(i, w)
+            cost += 1
+            for (dx, dy), delta in zip(hexgrid.OFFSET_NEIGHBORS[x & 1], self.deltas[x & 1]):
+                nx = x + dx
+                ny = y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                j = i + delta
+                if not passable[j] and j != goal_i:
+                    continue
+                if stamp[j] == query and g[j] <= cost:
+                    continue
+                stamp[j] = query
+                g[j] = cost
+                parent[j] = i
+                # Hex distance to the goal never overestimates, so paths are shortest
+                q, r = hexgrid.offset_to_axial(nx, ny)
+                dq = q - gq
+                dr = r - gr
+                heapq.heappush(heap, (cost + max(abs(dq), abs(dr), abs(dq + dr)), cost, j))
+        return None
+
+    def _trace(self, goal_i):
+        w = self.width
+        path = []
+        i = goal_i
+        while self.parent[i] != -1:
+            path.append((i % w, i // w))
+            i = self.parent[i]
+        path.reverse()
+        return path
+
+    def distance_field(self, start, avoid_unrevealed=False, avoid_monsters=False, radius=FIELD_RADIUS):
+        """Flat int32 steps from start to every tile within radius (-1 = unreachable)
+
+        The returned array is the pathfinder's own buffer: read it, don't keep it.
+        """
+        key = (tuple(start), avoid_unrevealed, avoid_monsters, radius, self.board.revision)
+        if key == self.field_key:
+            return self.dist
+        walkable = self.walkable(avoid_unrevealed, avoid_monsters)
+        table = self.board.neighbors
+        dist = self.dist
+        dist[self.touched] = -1
+
+        start_i = start[1] * self.width + start[0]
+        dist[start_i] = 0
+        frontier = np.array([start_i], dtype=np.int64)
+        reached = [frontier]
+        for step in range(1, radius + 1):
+            candidates = table[frontier].ravel()
+            candidates = candidates[candidates >= 0]
+            candidates = candidates[dist[candidates] < 0]
+            if not len(candidates):
+                break
+            # Monsters and unrevealed tiles get a distance (they can be goals)
+            # but the search doesn't continue through them
+            dist[candidates] = step
+            reached.append(candidates)
+            frontier = np.unique(candidates[walkable[candidates]])
+            if not len(frontier):
+                break
+        self.touched = np.concatenate(reached)
+        self.field_key = key
+        return dist
+
+    def path_from_field(self, start, goal, **options):
+        """Like find_path, but read off the cached distance field (None if outside it)"""
+        w = self.width
+        gx, gy = goal
+        if not (0 <= gx < w and 0 <= gy < self.board.height):
+            return None
+        dist = self.distance_field(start, **options)
+        i = gy * w + gx
+        steps = dist[i]
+        if steps < 0 or self.board.types[gy, gx] == TileType.WALL.value:
+            return None
+        if steps == 0:
+            return []
+        walkable = self.walkable(options.get('avoid_unrevealed', False),
+                                 options.get('avoid_monsters', False))
+        table = self.board.neighbors
+        path = [(gx, gy)]
+        # Walk downhill: every tile at distance d has a walkable neighbor at d - 1
+        while steps > 1:
+            for j in table[i]:
+                if j >= 0 and dist[j] == steps - 1 and walkable[j]:
+                    i = j
+                    break
+            steps -= 1
+            path.append((int(i) % w, int(i) // w))
+        path.reverse()
+        return path
@@ -0,0 +1,108 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+import numpy as np
+
+DEFAULT_CAPACITY = 4096  # Frames kept in the ring buffer (~68 s at 60 FPS)
+
+# Columns of the ring buffer, all in milliseconds. "frame" is the busy time of
+# the whole frame (events + update + draw + flip), without the sleep in
+# clock.tick; "update" is the scheduler's game-time step (monster turns, walking)
+SECTIONS = (
+    'frame', 'events', 'update', 'draw', 'flip',
+    'draw_main_menu', 'draw_settings', 'draw_character_select',
+    'draw_game_board', 'draw_combat', 'draw_ending',
+    'draw_header', 'draw_action_bar',
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Fixed-size ring buffer of per-frame section timings, tagged by game state"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, sections=SECTIONS):
+        self.sections = sections
+        self.columns = {name: i for i, name in enumerate(sections)}
+        self.samples = np.zeros((capacity, len(sections)), dtype=np.float32)
+        self.states = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.index = 0   # Next row to write
+        self.count = 0   # Rows filled so far (caps at capacity)
+        self.current = np.zeros(len(sections), dtype=np.float64)
+        self.frame_start = None
+
+    def begin_frame(self):
+        self.current[:] = 0.0
+        self.frame_start = time.perf_counter()
+
+    def add(self, section, seconds):
+        self.current[self.columns[section]] += seconds * 1000.0
+
+    @contextmanager
+    def timed(self, section):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(section, time.perf_counter() - start)
+
+    def end_frame(self, state_value):
+        self.add('frame', time.perf_counter() - self.frame_start)
+        self.samples[self.index] = self.current
+        self.states[self.index] = state_value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def wrap(self, obj, method_names):
+        # Time methods of one instance in place; the class itself is untouched
+        for name in method_names:
+            method = getattr(obj, name)
+
+            def timed_method(*args, _method=method, _name=name, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    self.add(_name, time.perf_counter() - start)
+
+            setattr(obj, name, timed_method)
+
+    def rows(self):
+        # Samples and states in chronological order
+        if self.count < self.capacity:
+            return self.samples[:self.count], self.states[:self.count]
+        order = np.r_[self.index:self.capacity, 0:self.index]
+        return self.samples[order], self.states[order]
+
+    def summary(self, section='frame'):
+        """{state value: (p50, p95, p99, frames)} for one section"""
+        samples, states = self.rows()
+        column = samples[:, self.columns[section]]
+        result = {}
+        for state_value in np.unique(states):
+            values = column[states == state_value]
+            result[int(state_value)] = tuple(np.percentile(values, PERCENTILES)) + (len(values),)
+        return result
+
+    def dump(self, path, state_names=None):
+        # CSV or JSON depending on the file extension
+        samples, states = self.rows()
+        state_names = state_names or {}
+        if path.endswith('.json'):
+            data = {
+                'sections': list(self.sections),
+                'states': [state_names.get(int(s), int(s)) for s in states],
+                'samples': np.round(samples, 4).tolist(),
+                'summary': {state_names.get(k, k): v for k, v in self.summary().items()},
+            }
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('state',) + self.sections)
+                for state_value, row in zip(states, samples):
+                    writer.writerow([state_names.get(int(state_value), int(state_value))]
+                                    + [f"{value:.4f}" for value in row])
@@ -0,0 +1,161 @@
+"""Input recording and deterministic replay.
+
+A recording is the Game's seeds plus every input event handed to
+Game.handle_event, each stamped with the scheduler step it arrived on.
+Feeding the events back on the same steps replays the session exactly: all
+randomness comes from the seeds and all timers run on game time.
+
+    python dungeo.py --record session.dgr
+    python replay.py session.dgr --speed 4
+    python replay.py session.dgr --headless
+"""
+import argparse
+import struct
+import time
+import pygame
+
+MAGIC = b'DGRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBqQ')  # magic, version, has fixed seed, seed, session seed
+RECORD = struct.Struct('<IBIhh')   # step, kind, key or button, x, y
+
+# Event kinds in the log. Only events the handlers act on are recorded
+QUIT, KEYDOWN, MOUSEBUTTONDOWN = range(3)
+
+
+class InputRecorder:
+    """Appends events to a binary log as Game.handle_event consumes them"""
+
+    def __init__(self, path, seed, session_seed):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed is not None, seed or 0, session_seed))
+        self.kinds = {pygame.QUIT: QUIT, pygame.KEYDOWN: KEYDOWN, pygame.MOUSEBUTTONDOWN: MOUSEBUTTONDOWN}
+
+    def record(self, step, event):
+        kind = self.kinds.get(event.type)
+        if kind is None:
+            return
+        if kind == KEYDOWN:
+            self.file.write(RECORD.pack(step, kind, event.key, 0, 0))
+        elif kind == MOUSEBUTTONDOWN:
+            self.file.write(RECORD.pack(step, kind, event.button, *event.pos))
+        else:
+            self.file.write(RECORD.pack(step, kind, 0, 0, 0))
+
+    def close(self):
+        self.file.close()
+
+
+class Recording:
+    def __init__(self, seed, session_seed, records):
+        self.seed = seed                  # Game(seed=...), None for random dungeons
+        self.session_seed = session_seed  # Seeds names and unseeded dungeons
+        self.records = records            # [(step, kind, code, x, y)] in order
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, has_seed, seed, session_seed = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Dungeo recording")
+        if version != VERSION:
+            raise ValueError(f"{path} is recording version {version}, expected {VERSION}")
+        body = memoryview(data)[HEADER.size:]
+        if len(body) % RECORD.size:
+            body = body[:len(body) - len(body) % RECORD.size]  # Cut off mid-write (crash)
+        records = list(RECORD.iter_unpack(body))
+        return cls(seed if has_seed else None, session_seed, records)
+
+    def events(self):
+        # (step, pygame event) pairs
+        for step, kind, code, x, y in self.records:
+            if kind == KEYDOWN:
+                event = pygame.event.Event(pygame.KEYDOWN, key=code, mod=0, unicode='')
+            elif kind == MOUSEBUTTONDOWN:
+                event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=code, pos=(x, y))
+            else:
+                event = pygame.event.Event(pygame.QUIT)
+            yield step, event
+
+
+def replay(game, recording, speed=1.0, draw=True):
+    """Feed a recording through game.handle_event on the recorded steps
+
+    speed is the game-time multiplier for watching along; None runs flat out
+    without pacing (and without drawing unless draw is set). Returns the
+    number of events replayed.
+    """
+    scheduler = game.scheduler
+    count = 0
+    last = time.perf_counter()
+    budget = 0.0  # Steps earned by real time and not yet run
+    for step, event in recording.events():
+        while scheduler.steps < step:
+            if speed is None:
+                scheduler.run_step()
+                continue
+            # Never run past the event's step, or timers would fire out of order
+            now = time.perf_counter()
+            budget += (now - last) * speed / scheduler.step
+            last = now
+            for _ in range(min(int(budget), step - scheduler.steps, scheduler.max_steps)):
+                scheduler.run_step()
+                budget -= 1
+            budget = min(budget, scheduler.max_steps)
+            for window_event in pygame.event.get():
+                if window_event.type == pygame.QUIT:
+                    return count
+            rects = game.render_frame() if draw else []
+            if rects:
+                pygame.display.update(rects)
+            game.clock.tick(game.fps)
+        if event.type == pygame.QUIT:
+            break
+        game.handle_event(event)
+        count += 1
+        if speed is None and draw:
+            game.draw()
+    return count
+
+
+def final_state(game):
+    # One line describing where the session ended, for comparing replays
+    sim = game.sim
+    parts = [sim.state.name, f"step={game.scheduler.steps}", f"seed={sim.game_seed}"]
+    if sim.player_stats is not None:
+        stats = sim.player_stats
+        parts.append(f"level={stats.level} hp={stats.hp}/{stats.max_hp} exp={stats.exp}")
+    if sim.game_board is not None:
+        parts.append(f"floor={sim.depth + 1} pos={tuple(sim.game_board.player_pos)}")
+    return " ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Dungeo session")
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=1.0, help="game-time multiplier, e.g. 4")
+    parser.add_argument('--headless', action='store_true',
+                        help="no window or pacing: replay as fast as possible")
+    parser.add_argument('--draw', action='store_true', help="headless: still draw after every event")
+    args = parser.parse_args(argv)
+
+    import dungeo
+
+    recording = Recording.load(args.path)
+    game = dungeo.Game(seed=recording.seed, session_seed=recording.session_seed,
+                       audio=not args.headless, video=not args.headless)
+    game.sim.board_cache = None  # Replays regenerate boards rather than touch the cache
+    game.loader.wait()
+    start = time.perf_counter()
+    if args.headless:
+        count = replay(game, recording, speed=None, draw=args.draw)
+    else:
+        count = replay(game, recording, speed=args.speed)
+    elapsed = time.perf_counter() - start
+    print(f"{count} events in {elapsed:.3f}s ({count / max(elapsed, 1e-9):.0f} events/sec)")
+    print(final_state(game))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Versioned binary snapshots of a Simulation.
+
+A snapshot holds everything needed to continue a session: state, combat
+turn, player, the battle (its monsters, turn order and status effects),
+RNG state and the board. The board's arrays are
+stored as raw bytes, so a snapshot costs about three bytes per tile and is
+cheap enough to take every turn. The floors left by the stairs follow,
+packed one byte per tile as in the FloorStore, and restoring replaces the
+store's contents with them, so a rewind or a load across a floor change
+finds every floor as it was left.
+"""
+import os
+import random
+import struct
+import tempfile
+import numpy as np
+from board import GameBoard, TILE_TYPES
+from floors import unpack, TYPE_MASK
+from status import EFFECTS
+from simulation import GameState, MonsterType, Monster, Battle, PlayerStats, PLAYER
+
+MAGIC = b'DGSV'
+VERSION = 6
+
+HEADER = struct.Struct('<4sH')
+SESSION = struct.Struct('<BBBqBqH')  # state, combat turn, has seed, seed, has game seed, game seed, depth
+STATS = struct.Struct('<9i')
+STAT_KEYS = ('level', 'exp', 'hp', 'max_hp', 'atk', 'def_', 'spd', 'spirit', 'max_spirit')  # PlayerStats attributes
+RNG = struct.Struct('<B625IBd')     # version, Mersenne Twister words, has gauss_next, gauss_next
+MONSTER = struct.Struct('<ii')      # level, hp
+BATTLE = struct.Struct('<qqII')     # initiative time, tiebreak counter, next id, monsters
+FIGHTER = struct.Struct('<II')      # id, summoner id or 0 (followed by the MONSTER record)
+TURN = struct.Struct('<Iiqq')       # id, wait, next turn time, tiebreak
+STATUS_COLUMNS = ('<i4', 'u1', '<i4', '<i4')  # target, effect code, potency, turns (after a LENGTH count)
+BOARD = struct.Struct('<HHiiBiiBq') # width, height, player x, y, has boss, boss x, y, has seed, seed
+FLOOR_KEY = struct.Struct('<qH')   # game seed, depth (then a BOARD record and the packed tiles)
+FLAG = struct.Struct('<B')
+LENGTH = struct.Struct('<I')
+
+COMBAT_TURNS = ("player", "monster")
+
+
+def _pack_text(text):
+    data = text.encode('utf-8')
+    return LENGTH.pack(len(data)) + data
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout):
+        try:
+            values = layout.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise ValueError("truncated snapshot")
+        self.offset += layout.size
+        return values
+
+    def take(self, size):
+        if self.offset + size > len(self.data):
+            raise ValueError("truncated snapshot")
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def text(self):
+        size, = self.unpack(LENGTH)
+        return str(self.take(size), 'utf-8')
+
+    def flag(self):
+        return bool(self.unpack(FLAG)[0])
+
+
+def _read_monster(reader):
+    name = reader.text()
+    if name not in MonsterType.__members__:
+        raise ValueError(f"unknown monster {name!r}")
+    monster_type = MonsterType[name]
+    level, hp = reader.unpack(MONSTER)
+    monster = Monster(level, monster_type=monster_type)
+    monster.hp = hp
+    return monster
+
+
+def _check_tiles(types):
+    # Codes outside TileType would index past the board's lookup tables
+    if types.size and (types.min() < 1 or types.max() >= len(TILE_TYPES)):
+        raise ValueError("unknown tile type")
+
+
+def dumps(sim):
+    """Snapshot a Simulation as bytes"""
+    parts = [HEADER.pack(MAGIC, VERSION),
+             SESSION.pack(sim.state.value, COMBAT_TURNS.index(sim.combat_turn),
+                          sim.seed is not None, sim.seed or 0,
+                          sim.game_seed is not None, sim.game_seed or 0, sim.depth),
+             _pack_text(sim.character_name),
+             _pack_text(sim.selected_class or ""),
+             _pack_text(sim.combat_message)]
+
+    version, words, gauss_next = sim.rng.getstate()
+    parts.append(RNG.pack(version, *words, gauss_next is not None, gauss_next or 0.0))
+
+    stats = sim.player_stats
+    parts.append(FLAG.pack(stats is not None))
+    if stats is not None:
+        parts.append(STATS.pack(*(getattr(stats, key) for key in STAT_KEYS)))
+
+    battle = sim.battle
+    parts.append(FLAG.pack(battle is not None))
+    if battle is not None:
+        # The current monster is the battle's front one
+        initiative = battle.initiative
+        parts.append(BATTLE.pack(initiative.now, initiative.sequence, battle.next_id, len(battle.monsters)))
+        for uid, monster in battle.monsters.items():
+            parts.append(FIGHTER.pack(uid, battle.summoners.get(uid, PLAYER)))
+            parts.append(_pack_text(monster.type.name))
+            parts.append(MONSTER.pack(monster.level, monster.hp))
+        for time, sequence, uid in initiative.entries():
+            parts.append(TURN.pack(uid, initiative.waits[uid], time, sequence))
+        parts.append(LENGTH.pack(len(battle.status)))
+        for column, dtype in zip(battle.status.columns(), STATUS_COLUMNS):
+            parts.append(column.astype(dtype).tobytes())
+    else:
+        # Outside a fight this is only the last monster fought, if any
+        monster = sim.current_monster
+        parts.append(FLAG.pack(monster is not None))
+        if monster is not None:
+            parts.append(_pack_text(monster.type.name))
+            parts.append(MONSTER.pack(monster.level, monster.hp))
+
+    board = sim.game_board
+    parts.append(FLAG.pack(board is not None))
+    if board is not None:
+        boss = board.boss_pos or (0, 0)
+        parts.append(BOARD.pack(board.width, board.height, *board.player_pos,
+                                board.boss_pos is not None, *boss,
+                                board.seed is not None, board.seed or 0))
+        for array in (board.types, board.chars, board.flags):
+            parts.append(np.ascontiguousarray(array).data)  # join copies it once
+
+    floors = list(sim.floors.entries())
+    parts.append(LENGTH.pack(len(floors)))
+    for (game_seed, depth), packed, (width, height, player_pos, boss_pos, seed) in floors:
+        parts.append(FLOOR_KEY.pack(game_seed, depth))
+        parts.append(BOARD.pack(width, height, *player_pos, boss_pos is not None, *(boss_pos or (0, 0)),
+                                seed is not None, seed or 0))
+        parts.append(np.ascontiguousarray(packed).data)
+    return b''.join(parts)
+
+
+def restore(sim, data):
+    """Overwrite a Simulation's session with a snapshot from dumps()
+
+    Malformed data raises ValueError and leaves the Simulation untouched.
+    """
+    reader = _Reader(data)
+    magic, version = reader.unpack(HEADER)
+    if magic != MAGIC:
+        raise ValueError("not a Dungeo snapshot")
+    if version != VERSION:
+        raise ValueError(f"snapshot version {version}, expected {VERSION}")
+
+    state, turn, has_seed, seed, has_game_seed, game_seed, depth = reader.unpack(SESSION)
+    state = GameState(state)
+    if turn >= len(COMBAT_TURNS):
+        raise ValueError(f"unknown combat turn {turn}")
+    character_name = reader.text()
+    selected_class = reader.text() or None
+    combat_message = reader.text()
+
+    rng_state = reader.unpack(RNG)
+    rng_state = (rng_state[0], rng_state[1:-2], rng_state[-1] if rng_state[-2] else None)
+    random.Random().setstate(rng_state)  # Raises ValueError on a bad state, before sim.rng is touched
+
+    stats = None
+    if reader.flag():
+        try:
+            stats = PlayerStats(character_name, selected_class)
+        except KeyError:
+            raise ValueError(f"unknown class {selected_class!r}")
+        for key, value in zip(STAT_KEYS, reader.unpack(STATS)):
+            setattr(stats, key, value)
+
+    battle = None
+    monster = None
+    if reader.flag():
+        now, sequence, next_id, count = reader.unpack(BATTLE)
+        battle = Battle(1)
+        for _ in range(count):
+            uid, summoner = reader.unpack(FIGHTER)
+            battle.monsters[uid] = _read_monster(reader)
+            if summoner != PLAYER:
+                battle.summoners[uid] = summoner
+        battle.type_counts.clear()
+        battle.type_counts.update(m.type for m in battle.monsters.values())
+        if any(summoner not in battle.monsters for summoner in battle.summoners.values()):
+            raise ValueError("minion without its summoner")
+        battle.next_id = next_id
+        turns = [reader.unpack(TURN) for _ in range(count + 1)]
+        if sorted(uid for uid, _, _, _ in turns) != sorted([PLAYER, *battle.monsters]):
+            raise ValueError("battle turn order doesn't match its monsters")
+        battle.initiative.load(now, sequence,
+                               [(time, seq, uid) for uid, _, time, seq in turns],
+                               {uid: wait for uid, wait, _, _ in turns})
+        count, = reader.unpack(LENGTH)
+        columns = [np.frombuffer(reader.take(count * np.dtype(dtype).itemsize), dtype=dtype)
+                   for dtype in STATUS_COLUMNS]
+        if count and (columns[0].min() < 0 or columns[0].max() >= next_id
+                      or columns[1].max() >= len(EFFECTS)):
+            raise ValueError("status effect out of range")
+        battle.status.load(*columns)
+        monster = battle.monsters.get(battle.front)
+    elif reader.flag():
+        monster = _read_monster(reader)
+
+    board = None
+    if reader.flag():
+        width, height, px, py, has_boss, bx, by, has_board_seed, board_seed = reader.unpack(BOARD)
+        if not has_board_seed:
+            board_seed = None
+        arrays = [np.frombuffer(reader.take(width * height), dtype=np.uint8).reshape(height, width)
+                  for _ in range(3)]
+        _check_tiles(arrays[0])
+        board = GameBoard.from_arrays(*arrays, (px, py), (bx, by) if has_boss else None, seed=board_seed)
+
+    floors = []
+    count, = reader.unpack(LENGTH)
+    for _ in range(count):
+        key = reader.unpack(FLOOR_KEY)
+        width, height, px, py, has_boss, bx, by, has_floor_seed, floor_seed = reader.unpack(BOARD)
+        meta = (width, height, (px, py), (bx, by) if has_boss else None,
+                floor_seed if has_floor_seed else None)
+        packed = np.frombuffer(reader.take(width * height), dtype=np.uint8)
+        _check_tiles(packed & TYPE_MASK)
+        floors.append((key, unpack(packed, meta)))
+
+    # Only touch the simulation once the whole snapshot has parsed
+    sim.state = state
+    sim.combat_turn = COMBAT_TURNS[turn]
+    sim.seed = seed if has_seed else None
+    sim.game_seed = game_seed if has_game_seed else None
+    sim.depth = depth
+    sim.character_name = character_name
+    sim.selected_class = selected_class
+    sim.combat_message = combat_message
+    sim.rng.setstate(rng_state)
+    sim.player_stats = stats
+    sim.battle = battle
+    sim.current_monster = monster
+    sim.game_board = board
+    sim.floors.clear()
+    for key, floor in floors:
+        sim.floors.put(key, floor)
+
+
+def save(sim, path):
+    # Written to a temp file and renamed, so a crash never leaves half a save
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(sim))
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load(sim, path):
+    with open(path, 'rb') as f:
+        restore(sim, f.read())
@@ -0,0 +1,101 @@
+"""Fixed-timestep game clock with a queue of timed callbacks.
+
+Game time only moves in whole steps, so timers fire after the same number of
+steps however fast or slow frames are rendered. The render loop feeds in real
+elapsed time with advance(); replays and tests can skip ahead with
+fast_forward() without waiting. Nothing here imports pygame.
+"""
+import heapq
+import itertools
+import math
+
+STEP = 1 / 60      # Seconds of game time per simulation step
+MAX_STEPS = 15     # Steps one advance() may run before dropping the backlog
+
+
+class Timer:
+    """Handle returned by Scheduler.call_later, used to cancel it"""
+    __slots__ = ('due', 'callback', 'args', 'cancelled')
+
+    def __init__(self, due, callback, args):
+        self.due = due  # Step number the callback runs on
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class Scheduler:
+    def __init__(self, step=STEP, max_steps=MAX_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.steps = 0            # Steps simulated so far
+        self.accumulator = 0.0    # Real time not yet turned into steps
+        self.queue = []           # Heap of (due step, sequence, Timer)
+        self.sequence = itertools.count()  # Keeps same-step timers in call order
+        self.live = 0             # Timers queued and not cancelled
+
+    @property
+    def time(self):
+        # Game time in seconds
+        return self.steps * self.step
+
+    @property
+    def ticks(self):
+        # Game time in milliseconds, the same unit as pygame.time.get_ticks
+        return int(self.steps * self.step * 1000)
+
+    def call_later(self, delay, callback, *args):
+        # Rounded up to whole steps so a timer never fires early
+        due = self.steps + max(1, math.ceil(delay / self.step - 1e-9))
+        timer = Timer(due, callback, args)
+        heapq.heappush(self.queue, (due, next(self.sequence), timer))
+        self.live += 1
+        return timer
+
+    def cancel(self, timer):
+        # Cancelled timers stay in the heap and are skipped when they come up
+        if timer is not None and not timer.cancelled and timer.due > self.steps:
+            timer.cancelled = True
+            self.live -= 1
+
+    def pending(self):
+        return self.live > 0
+
+    def time_until_next(self):
+        """Seconds of game time until the next live timer, or None"""
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        if not self.queue:
+            return None
+        return max(0, self.queue[0][0] - self.steps) * self.step
+
+    def run_step(self):
+        self.steps += 1
+        while self.queue and self.queue[0][0] <= self.steps:
+            _, _, timer = heapq.heappop(self.queue)
+            if timer.cancelled:
+                continue
+            self.live -= 1
+            timer.callback(*timer.args)
+
+    def advance(self, elapsed):
+        """Turn real elapsed seconds into whole steps; returns the steps run
+
+        A frame slower than max_steps drops the rest of its time, so a stall
+        slows the game down briefly instead of replaying a burst of steps.
+        """
+        self.accumulator += elapsed
+        count = 0
+        while self.accumulator >= self.step:
+            if count == self.max_steps:
+                self.accumulator = 0.0
+                break
+            self.accumulator -= self.step
+            self.run_step()
+            count += 1
+        return count
+
+    def fast_forward(self, seconds):
+        # Run game time ahead without waiting and without the max_steps cap
+        for _ in range(math.ceil(seconds / self.step - 1e-9)):
+            self.run_step()
@@ -0,0 +1,629 @@
+"""Headless game rules: board, player, combat and progression.
+
+Nothing here imports pygame, so the engine can be stepped on servers and in
+tools without a display or audio device. dungeo.Game renders it and turns
+input events into calls on Simulation.
+"""
+from collections import Counter
+from enum import Enum
+import random
+import numpy as np
+from board import GRID_SIZE, TileType, TILE_TYPES, GameBoard
+from floors import FloorStore, prepare_floor
+from initiative import Initiative
+from status import Effect, StatusTable, PERMANENT
+
+DUNGEON_FLOORS = 3        # The boss waits on the bottom floor
+FLOOR_MONSTER_LEVELS = 1  # Monster levels added per floor down
+
+PLAYER = 0             # The player's id in a battle; monsters are numbered from 1
+PACK_SIZE = 2          # Extra wolves running with a Dire Wolf
+PACK_BONUS = 2         # ATK a wolf gains for every other wolf still fighting
+MAX_MINIONS = 6        # Summoned minions alive at once
+SUMMON_CHANCE = 0.5    # Chance a summoner calls a minion instead of attacking
+MINION_LEVEL_DROP = 5  # Minions are this many levels below their summoner
+MAX_FOES = 12          # Slimes stop splitting once a battle has this many monsters
+
+
+class GameState(Enum):
+    MAIN_MENU = 1
+    SETTINGS = 2
+    CHARACTER_SELECT = 3
+    GAME_BOARD = 4
+    COMBAT = 5
+    ENDING = 6
+
+class CharacterClass(Enum):
+    WARRIOR = ("Warrior", "", "Tank class with high HP and defense", {
+        'HP': 120, 'ATK': 8, 'DEF': 10, 'SPD': 5,
+        'description': "A stalwart defender skilled in combat",
+        'special': "Shield Bash - Deals damage and increases defense"
+    })
+    SCOUT = ("Scout", "", "Agile class with high speed and attack", {
+        'HP': 80, 'ATK': 12, 'DEF': 5, 'SPD': 12,
+        'description': "A swift hunter with deadly precision",
+        'special': "Rapid Strike - Deals multiple hits in succession"
+    })
+    SHAMAN = ("Shaman", "", "Magical class with balanced stats", {
+        'HP': 90, 'ATK': 10, 'DEF': 7, 'SPD': 8,
+        'description': "A mystic wielder of ancient magic",
+        'special': "Healing Wave - Restores HP and boosts attack"
+    })
+
+class MonsterType(Enum):
+    # Format: (name, symbol, hp_mult, atk_mult, def_mult, special_ability)
+    # Level 1-2 monsters
+    SLIME = ("Slime", "🟢", 0.8, 0.7, 0.5, "Splits into two when damaged")
+    RAT = ("Giant Rat", "🐀", 0.6, 1.0, 0.4, "Inflicts poison damage")
+    BAT = ("Vampire Bat", "🦇", 0.5, 0.8, 0.3, "Life steal attack")
+
+    # Level 3-4 monsters
+    SKELETON = ("Skeleton Warrior", "💀", 0.9, 1.1, 0.8, "Bone armor reduces damage")
+    GOBLIN = ("Goblin Rogue", "👺", 0.8, 1.2, 0.6, "Steals gold on hit")
+    WOLF = ("Dire Wolf", "🐺", 1.0, 1.3, 0.7, "Pack tactics increase damage")
+
+    # Level 5-7 monsters
+    GHOST = ("Haunted Spirit", "👻", 0.8, 1.4, 1.2, "Phases through attacks")
+    ORC = ("Orc Warrior", "👹", 1.3, 1.5, 1.0, "Berserker rage when low HP")
+
+    # Level 8+ boss monsters
+    DRAGON = ("Ancient Dragon", "🐲", 2.0, 1.8, 1.6, "Breathes fire")
+    DEMON = ("Demon Lord", "👿", 1.8, 2.0, 1.5, "Summons minions")
+
+def monster_choices(level):
+    # Monster types that can spawn at a given level
+    if level < 3:
+        return [MonsterType.SLIME, MonsterType.RAT, MonsterType.BAT]
+    elif level < 5:
+        return [MonsterType.SKELETON, MonsterType.GOBLIN, MonsterType.WOLF]
+    elif level < 8:
+        return [MonsterType.GHOST, MonsterType.ORC]
+    else:
+        return [MonsterType.DRAGON, MonsterType.DEMON]
+
+class MonsterKind:
+    """What every monster of one MonsterType shares, built once per type"""
+    __slots__ = ('type', 'name', 'emoji', 'hp_mult', 'atk_mult', 'def_mult', 'special_ability')
+
+    def __init__(self, monster_type):
+        self.type = monster_type
+        (self.name, self.emoji, self.hp_mult, self.atk_mult, self.def_mult,
+         self.special_ability) = monster_type.value
+
+
+class ClassInfo:
+    """Starting stats and texts of one CharacterClass, built once per class"""
+    __slots__ = ('type', 'name', 'icon', 'summary', 'hp', 'atk', 'def_', 'spd', 'description', 'special')
+
+    def __init__(self, char_class):
+        self.type = char_class
+        self.name, self.icon, self.summary, stats = char_class.value
+        self.hp = stats['HP']
+        self.atk = stats['ATK']
+        self.def_ = stats['DEF']
+        self.spd = stats['SPD']
+        self.description = stats['description']
+        self.special = stats['special']
+
+
+MONSTER_KINDS = {monster_type: MonsterKind(monster_type) for monster_type in MonsterType}
+CLASS_INFO = {char_class: ClassInfo(char_class) for char_class in CharacterClass}
+
+STARTING_SPIRIT = 100
+
+
+class PlayerStats:
+    """The hero's numbers, read on every frame and every blow"""
+    __slots__ = ('name', 'class_name', 'level', 'exp', 'hp', 'max_hp', 'atk', 'def_', 'spd',
+                 'spirit', 'max_spirit')
+
+    def __init__(self, name, class_name):
+        # A new level 1 hero of the named class
+        info = CLASS_INFO[CharacterClass[class_name]]
+        self.name = name
+        self.class_name = class_name
+        self.level = 1
+        self.exp = 0
+        self.hp = info.hp
+        self.max_hp = info.hp
+        self.atk = info.atk
+        self.def_ = info.def_
+        self.spd = info.spd
+        self.spirit = STARTING_SPIRIT
+        self.max_spirit = STARTING_SPIRIT
+
+    def level_up(self):
+        self.level += 1
+        self.exp = 0
+        self.max_hp += 10
+        self.hp = self.max_hp
+        self.atk += 2
+        self.def_ += 1
+
+
+class Monster:
+    # Slotted, with the per-type data shared through its MonsterKind, so big
+    # battles cost a few small objects per monster
+    __slots__ = ('kind', 'type', 'level', 'hp', 'max_hp', 'atk', 'def_', 'exp_reward', 'spd')
+
+    def __init__(self, level, rng=random, monster_type=None):
+        self.level = level
+        # Choose monster type based on level, unless restoring a known one
+        self.type = monster_type or rng.choice(monster_choices(level))
+        kind = self.kind = MONSTER_KINDS[self.type]
+        base_hp = 50 + level * 10
+        base_atk = 5 + level * 2
+        base_def = 3 + level
+
+        self.hp = int(base_hp * kind.hp_mult)
+        self.max_hp = self.hp
+        self.atk = int(base_atk * kind.atk_mult)
+        self.def_ = int(base_def * kind.def_mult)
+        self.exp_reward = 20 + level * 10
+        self.spd = 4 + level  # Turn order; class SPD runs 5-12
+
+    @property
+    def name(self):
+        return self.kind.name
+
+    @property
+    def emoji(self):
+        return self.kind.emoji
+
+    @property
+    def special_ability(self):
+        return self.kind.special_ability
+
+
+# What each monster's special does. Triggers: "spawn" on arrival, "turn"
+# instead of attacking, "attack" when working out its damage, "hit" after it
+# damages the player, "struck" before it takes damage, "hurt" after it takes
+# damage, "low_hp" once it's at half HP or less
+# Format: (trigger, action, effect, potency, turns, chance)
+MONSTER_ABILITIES = {
+    MonsterType.SLIME: ("hurt", "split", None, 0, 0, 0.5),
+    MonsterType.RAT: ("hit", "afflict", Effect.POISON, 2, 3, 1.0),
+    MonsterType.BAT: ("hit", "drain", None, 50, 0, 1.0),        # Heals this % of the damage
+    MonsterType.SKELETON: ("spawn", "buff", Effect.ARMOR, 3, PERMANENT, 1.0),
+    MonsterType.GOBLIN: ("hit", "steal", None, 5, 0, 1.0),      # Spirit, there being no gold
+    MonsterType.WOLF: ("attack", "pack", None, PACK_BONUS, 0, 1.0),
+    MonsterType.GHOST: ("struck", "phase", None, 0, 0, 0.25),
+    MonsterType.ORC: ("low_hp", "buff", Effect.RAGE, 4, PERMANENT, 1.0),
+    MonsterType.DRAGON: ("hit", "afflict", Effect.BURN, 4, 2, 0.5),
+    MonsterType.DEMON: ("turn", "summon", None, MINION_LEVEL_DROP, 0, SUMMON_CHANCE),
+}
+
+# Player specials, paid for with spirit; damage ignores the monster's DEF
+# Format: (spirit cost, hits, ATK multiplier per hit, ((effect, potency, turns), ...) on the player)
+CLASS_SPECIALS = {
+    CharacterClass.WARRIOR: (20, 1, 1.5, ((Effect.GUARD, 4, 3),)),
+    CharacterClass.SCOUT: (20, 3, 0.8, ()),
+    CharacterClass.SHAMAN: (20, 1, 1.2, ((Effect.REGEN, 5, 3), (Effect.EMPOWER, 3, 3))),
+}
+
+DEFEND_EFFECT = (Effect.GUARD, 2, 1)  # Until the player's next turn
+
+
+class Battle:
+    """The monsters in one fight and the SPD turn order between them and the player
+
+    The player opens every fight; after that initiative.Initiative decides.
+    Monsters are kept in arrival order and the player fights the front one.
+    """
+
+    def __init__(self, player_spd):
+        self.initiative = Initiative()
+        self.initiative.add(PLAYER, player_spd, first_turn=0)
+        self.initiative.next()  # The player's opening turn
+        self.monsters = {}      # id -> Monster, only those still standing
+        self.summoners = {}     # Summoned id -> id of its summoner; they vanish together
+        self.type_counts = Counter()
+        self.status = StatusTable()  # Effects on the player and the monsters, by id
+        self.next_id = 1
+
+    def add(self, monster, summoner=None):
+        uid = self.next_id
+        self.next_id += 1
+        self.monsters[uid] = monster
+        self.type_counts[monster.type] += 1
+        if summoner is not None:
+            self.summoners[uid] = summoner
+        self.initiative.add(uid, monster.spd)
+        return uid
+
+    def remove(self, uid):
+        # The monster leaves the fight, and the minions it summoned go with it
+        monster = self.monsters.pop(uid)
+        self.type_counts[monster.type] -= 1
+        self.summoners.pop(uid, None)
+        self.initiative.remove(uid)
+        for minion in [minion for minion, summoner in self.summoners.items() if summoner == uid]:
+            self.remove(minion)
+
+    @property
+    def front(self):
+        # Id of the monster the player is fighting (the longest-standing one)
+        return next(iter(self.monsters), None)
+
+    def alive(self):
+        # Bool array by id of who is still fighting
+        alive = np.zeros(self.next_id, dtype=bool)
+        alive[PLAYER] = True
+        alive[np.fromiter(self.monsters, dtype=np.int64, count=len(self.monsters))] = True
+        return alive
+
+
+class Simulation:
+    """All game state and rules for one session, without any rendering"""
+
+    def __init__(self, seed=None, board_cache=None, rng=None, prefetcher=None, floors=DUNGEON_FLOORS):
+        self.state = GameState.MAIN_MENU
+        self.seed = seed  # Fixed seed for every new game (daily challenge), or None
+        self.board_cache = board_cache
+        self.prefetcher = prefetcher  # Optional BoardPrefetcher building the next board early
+        self.rng = rng or random.Random(seed)
+        self.first_seed = self.rng.randrange(2 ** 32)  # Seed of the first unseeded game
+        self.character_name = ""
+        self.selected_class = None
+        self.game_board = None
+        self.game_seed = None
+        self.floor_count = floors
+        self.depth = 0  # Current floor, 0 at the top
+        self.floors = FloorStore()  # Floors left by the stairs, keyed by (game seed, depth)
+        self.dungeon_cache = None  # Board cache for this game's floors (shared dungeons only)
+        self.player_stats = None
+        self.battle = None
+        self.current_monster = None  # The front monster of the battle
+        self.combat_message = ""
+        self.combat_turn = "player"  # player or monster
+        self.prefetch_next_board()
+
+    def init_game(self, seed=None):
+        # Initialize game board. Explicitly seeded dungeons are shared between
+        # players, so they go through the on-disk cache if there is one; others
+        # get a fresh seed that is still recorded so the run can be reproduced
+        if seed is None:
+            seed = self.seed
+        self.dungeon_cache = self.board_cache if seed is not None else None
+        if seed is None:
+            seed = self.next_seed
+        self.game_seed = seed
+        self.depth = 0
+        self.floors.clear()
+        self.game_board = self.build_floor(0)
+        self.rng = random.Random(seed)
+        self.prefetch_next_board()
+
+        self.initialize_player_stats()
+
+        # Initialize combat variables
+        self.combat_message = ""
+        self.combat_turn = "player"
+        self.battle = None
+        self.current_monster = None
+
+    @property
+    def next_seed(self):
+        # Seed the next new game will get, known ahead so its board can be prefetched.
+        # Each game's successor is hashed off its seed (not drawn from its RNG, which
+        # combat consumes), so the whole chain follows from the session seed
+        if self.seed is not None:
+            return self.seed
+        if self.game_seed is None:
+            return self.first_seed
+        return random.Random(f"next-{self.game_seed}").randrange(2 ** 32)
+
+    def floor_seed(self, depth):
+        # Each floor's board seed follows from the game seed
+        if depth == 0:
+            return self.game_seed
+        return random.Random(f"floor-{self.game_seed}-{depth}").randrange(2 ** 32)
+
+    def build_floor(self, depth):
+        seed = self.floor_seed(depth)
+        if self.prefetcher is not None:
+            board = self.prefetcher.take(seed, GRID_SIZE, cache=self.dungeon_cache)
+        elif self.dungeon_cache is not None:
+            board = self.dungeon_cache.get_board(seed, GRID_SIZE)
+        else:
+            board = GameBoard(seed=seed)
+        return prepare_floor(board, depth, bottom=depth == self.floor_count - 1)
+
+    def prefetch_next_board(self):
+        # Queue the floor below (unless it's stored) and the next new game's board
+        if self.prefetcher is None:
+            return
+        below = self.depth + 1
+        if (self.game_board is not None and below < self.floor_count
+                and (self.game_seed, below) not in self.floors):
+            self.prefetcher.prefetch(self.floor_seed(below), GRID_SIZE, cache=self.dungeon_cache)
+        cache = self.board_cache if self.seed is not None else None
+        self.prefetcher.prefetch(self.next_seed, GRID_SIZE, cache=cache)
+
+    def change_floor(self, depth):
+        # Take the stairs: store this floor as it is and bring up the other one
+        self.floors.put((self.game_seed, self.depth), self.game_board)
+        board = self.floors.take((self.game_seed, depth))
+        if board is None:
+            board = self.build_floor(depth)
+        self.game_board = board
+        self.depth = depth
+        self.combat_message = f"You reach floor {depth + 1}."
+        self.prefetch_next_board()
+
+    def initialize_player_stats(self):
+        self.player_stats = PlayerStats(self.character_name, self.selected_class)
+
+    def start_game(self, selected_class, character_name, seed=None):
+        self.selected_class = selected_class
+        self.character_name = character_name
+        self.init_game(seed)
+        self.state = GameState.GAME_BOARD
+
+    def move_player(self, dx, dy):
+        tile_type = self.game_board.move_player(dx, dy)
+        self.process_tile_event(tile_type)
+        return tile_type
+
+    def start_combat(self, level):
+        self.current_monster = Monster(level, self.rng)
+        self.battle = Battle(self.player_stats.spd)
+        self.add_monster(self.current_monster)
+        self.combat_message = f"A {self.current_monster.name} appears!"
+        if self.current_monster.type == MonsterType.WOLF:
+            for _ in range(PACK_SIZE):
+                self.add_monster(Monster(level, self.rng, MonsterType.WOLF))
+            self.combat_message = f"A pack of {PACK_SIZE + 1} {self.current_monster.name}s appears!"
+        self.combat_turn = "player"
+        self.state = GameState.COMBAT
+
+    def add_monster(self, monster, summoner=None):
+        uid = self.battle.add(monster, summoner)
+        ability = MONSTER_ABILITIES.get(monster.type)
+        if ability is not None and ability[0] == "spawn":
+            _, _, effect, potency, turns, _ = ability
+            self.battle.status.add(uid, effect, potency, turns)
+        return uid
+
+    def ability(self, monster, trigger):
+        # The monster's ability if it has one for this trigger and it fires this time
+        ability = MONSTER_ABILITIES.get(monster.type)
+        if ability is None or ability[0] != trigger:
+            return None
+        if ability[5] < 1.0 and self.rng.random() >= ability[5]:
+            return None
+        return ability
+
+    def hurt_monster(self, uid, damage, notes):
+        # Deal damage to a monster and run its reactions; returns the damage taken
+        battle = self.battle
+        monster = battle.monsters[uid]
+        if self.ability(monster, "struck") is not None:
+            notes.append(f"{monster.name} phases through the attack!")
+            return 0
+        monster.hp -= damage
+        if monster.hp <= 0:
+            return damage
+        ability = self.ability(monster, "hurt")
+        if ability is not None and len(battle.monsters) < MAX_FOES and monster.hp > 1:
+            # Split: half the remaining HP goes to a new monster of the same kind
+            twin = Monster(monster.level, self.rng, monster.type)
+            twin.hp = monster.hp // 2
+            monster.hp -= twin.hp
+            self.add_monster(twin, battle.summoners.get(uid))  # A split minion keeps its summoner
+            notes.append(f"{monster.name} splits in two!")
+        if monster.hp * 2 <= monster.max_hp:
+            ability = MONSTER_ABILITIES.get(monster.type)
+            if ability is not None and ability[0] == "low_hp" and not battle.status.has(uid, ability[2]):
+                _, _, effect, potency, turns, _ = ability
+                battle.status.add(uid, effect, potency, turns)
+                notes.append(f"{monster.name} flies into a {effect.value[0].lower()}!")
+        return damage
+
+    def process_tile_event(self, tile_type):
+        if tile_type == TileType.MONSTER:
+            self.start_combat(self.player_stats.level + self.depth * FLOOR_MONSTER_LEVELS)
+        elif tile_type == TileType.TREASURE:
+            # Heal player and give spirit points
+            heal = min(20, self.player_stats.max_hp - self.player_stats.hp)
+            self.player_stats.hp += heal
+            spirit_gain = min(20, self.player_stats.max_spirit - self.player_stats.spirit)
+            self.player_stats.spirit += spirit_gain
+            if heal > 0 or spirit_gain > 0:
+                self.combat_message = f"Found treasure! Healed {heal} HP and gained {spirit_gain} Spirit!"
+        elif tile_type == TileType.STORY:
+            self.combat_message = "You discover an ancient inscription..."
+        elif tile_type == TileType.BOSS_ROOM:
+            self.start_combat(self.player_stats.level + 5)
+        elif tile_type == TileType.STAIRS_DOWN:
+            self.change_floor(self.depth + 1)
+        elif tile_type == TileType.STAIRS_UP:
+            self.change_floor(self.depth - 1)
+
+    def is_boss_fight(self):
+        # Fights happen on the tile that started them. Deep floors make ordinary
+        # monsters out-level the player too, so the monster's level can't tell
+        x, y = self.game_board.player_pos
+        return TILE_TYPES[self.game_board.types[y, x]] == TileType.BOSS_ROOM
+
+    def execute_combat_action(self, action):
+        battle = self.battle
+        status = battle.status
+        front = battle.front
+        notes = []
+        special = CLASS_SPECIALS[CharacterClass[self.selected_class]]
+        if action == "Attack":
+            # Calculate damage
+            atk = self.player_stats.atk + status.atk_bonus(PLAYER)
+            damage = max(1, atk - self.current_monster.def_ - status.def_bonus(front))
+            damage = self.hurt_monster(front, damage, notes)
+            self.combat_message = " ".join([f"You deal {damage} damage!", *notes])
+
+        elif action == "Defend":
+            # Increase defense temporarily and heal
+            status.add(PLAYER, *DEFEND_EFFECT)
+            heal = min(10, self.player_stats.max_hp - self.player_stats.hp)
+            self.player_stats.hp += heal
+            self.combat_message = f"Defense up! Healed {heal} HP!"
+
+        elif action == "Special" and self.player_stats.spirit >= special[0]:
+            # Special attack that uses spirit points
+            cost, hits, multiplier, effects = special
+            self.player_stats.spirit -= cost
+            damage = int((self.player_stats.atk + status.atk_bonus(PLAYER)) * multiplier)
+            total = 0
+            for _ in range(hits):
+                total += self.hurt_monster(front, damage, notes)
+                if self.current_monster.hp <= 0:
+                    break
+            for effect, potency, turns in effects:
+                status.add(PLAYER, effect, potency, turns)
+            name = CLASS_INFO[CharacterClass[self.selected_class]].special.split(" - ")[0]
+            self.combat_message = " ".join([f"{name} deals {total} damage!", *notes])
+
+        elif action == "Run":
+            # Can't run from boss battles
+            if self.is_boss_fight():
+                self.combat_message = "Cannot escape from a boss battle!"
+                return
+            # 50% chance to run
+            if self.rng.random() > 0.5:
+                self.state = GameState.GAME_BOARD
+                self.combat_message = "Got away safely!"
+                self.battle = None
+                return
+            else:
+                self.combat_message = "Couldn't escape!"
+
+        # Check if monster is defeated
+        if self.current_monster.hp <= 0 and self.defeat(front):
+            return
+
+        # Whoever is next in the SPD order: a fast player may go again
+        if self.battle.initiative.peek() == PLAYER:
+            self.start_player_turn()
+        else:
+            self.combat_turn = "monster"
+
+    def start_player_turn(self):
+        # Effects tick once at the start of each of the player's turns
+        battle = self.battle
+        battle.initiative.next()
+        self.combat_turn = "player"
+        hp = battle.status.tick(battle.alive())
+        notes = []
+        change = int(hp[PLAYER])
+        if change:
+            stats = self.player_stats
+            stats.hp = min(stats.max_hp, stats.hp + change)
+            notes.append(f"Effects deal {-change} damage!" if change < 0 else f"Effects restore {change} HP!")
+        fallen = []
+        for uid in np.flatnonzero(hp[1:]) + 1:
+            monster = battle.monsters[int(uid)]
+            monster.hp = min(monster.max_hp, monster.hp + int(hp[uid]))
+            if monster.hp <= 0:
+                fallen.append(int(uid))
+        if notes:
+            self.combat_message = " ".join([self.combat_message, *notes]).strip()
+        if self.player_stats.hp <= 0:
+            self.state = GameState.ENDING
+            return
+        for uid in fallen:
+            if uid in battle.monsters and self.defeat(uid):
+                return
+
+    def defeat(self, fallen):
+        # A monster falls; returns True if that ends the battle
+        battle = self.battle
+        monster = battle.monsters[fallen]
+        self.player_stats.exp += monster.exp_reward
+        victory_message = f"{monster.name} defeated! Gained {monster.exp_reward} EXP!"
+        battle.remove(fallen)
+        if battle.monsters:
+            self.current_monster = battle.monsters[battle.front]
+            if monster is not self.current_monster:
+                victory_message += f" {self.current_monster.name} steps up!"
+            self.combat_message = victory_message
+            return False
+        self.current_monster = monster
+
+        # Check if this was a boss monster
+        if self.is_boss_fight():
+            victory_message += "\nCongratulations! You have defeated the boss and won the game!"
+            self.combat_message = victory_message
+            self.state = GameState.ENDING
+            self.battle = None
+            return True
+
+        self.combat_message = victory_message
+        self.check_level_up()
+        self.state = GameState.GAME_BOARD
+        self.battle = None
+        return True
+
+    def check_level_up(self):
+        if self.player_stats.exp >= self.player_stats.level * 100:
+            self.player_stats.level_up()
+            self.combat_message += f"\nLevel Up! Now level {self.player_stats.level}!"
+
+    def handle_monster_turn(self):
+        # Every monster due before the player's next turn acts, in SPD order
+        battle = self.battle
+        initiative = battle.initiative
+        messages = []
+        hits = 0
+        total = 0
+        status = battle.status
+        stats = self.player_stats
+        while stats.hp > 0 and initiative.peek() != PLAYER:
+            uid = initiative.next()
+            monster = battle.monsters[uid]
+            if len(battle.summoners) < MAX_MINIONS and self.ability(monster, "turn") is not None:
+                minion = Monster(max(1, monster.level - MINION_LEVEL_DROP), self.rng)
+                self.add_monster(minion, summoner=uid)
+                messages.append(f"{monster.name} summons a {minion.name}!")
+                continue
+            atk = monster.atk + status.atk_bonus(uid)
+            ability = self.ability(monster, "attack")
+            if ability is not None:
+                # Pack tactics: stronger for every other monster of its kind still fighting
+                atk += ability[3] * (battle.type_counts[monster.type] - 1)
+            damage = max(1, atk - stats.def_ - status.def_bonus(PLAYER))
+            stats.hp -= damage
+            hits += 1
+            total += damage
+            name = monster.name
+
+            ability = self.ability(monster, "hit")
+            if ability is None:
+                continue
+            _, action, effect, potency, turns, _ = ability
+            if action == "afflict":
+                status.add(PLAYER, effect, potency, turns)
+            elif action == "drain":
+                monster.hp = min(monster.max_hp, monster.hp + damage * potency // 100)
+            elif action == "steal":
+                stats.spirit -= min(potency, stats.spirit)
+        if hits == 1:
+            messages.append(f"{name} deals {total} damage!")
+        elif hits:
+            messages.append(f"{hits} hits deal {total} damage!")
+        self.combat_message = " ".join(messages)
+
+        # Check if player is defeated
+        if stats.hp <= 0:
+            self.state = GameState.ENDING
+        else:
+            self.start_player_turn()
+
+    def reset(self):
+        # Back to the main menu after an ending
+        self.state = GameState.MAIN_MENU
+        self.player_stats = None
+        self.game_board = None
+        self.depth = 0
+        self.floors.clear()
+        self.battle = None
+        self.current_monster = None
+        self.combat_message = ""
+        self.combat_turn = "player"
@@ -0,0 +1,125 @@
+"""Status effects on battle combatants, kept as columns of NumPy arrays.
+
+Every active effect is one row: who it's on, which Effect, its potency and
+the turns it has left. What an effect does is data in the Effect table
+(HP per turn, ATK and DEF per point of potency), so one tick covers every
+effect in the battle with a handful of array operations instead of a Python
+callback per effect. The per-combatant ATK/DEF totals are kept alongside,
+so combat reads a modifier in O(1) however many effects are running.
+"""
+from enum import Enum
+import numpy as np
+
+PERMANENT = -1  # Turns left for an effect that lasts the whole battle
+
+
+class Effect(Enum):
+    # Format: (name, hp per turn, atk, def), each per point of potency
+    POISON = ("Poison", -1, 0, 0)
+    BURN = ("Burning", -1, 0, 0)
+    REGEN = ("Regeneration", 1, 0, 0)
+    GUARD = ("Guard", 0, 0, 1)
+    ARMOR = ("Bone Armor", 0, 0, 1)
+    RAGE = ("Rage", 0, 1, -1)
+    EMPOWER = ("Empowered", 0, 1, 0)
+
+
+EFFECTS = list(Effect)  # code -> Effect
+EFFECT_CODES = {effect: code for code, effect in enumerate(EFFECTS)}
+HP_RATE = np.array([effect.value[1] for effect in EFFECTS], dtype=np.int64)
+ATK_RATE = np.array([effect.value[2] for effect in EFFECTS], dtype=np.int64)
+DEF_RATE = np.array([effect.value[3] for effect in EFFECTS], dtype=np.int64)
+
+
+class StatusTable:
+    """The active effects of one battle, ticked all at once"""
+
+    def __init__(self, capacity=16):
+        self.size = 0
+        self.target = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.potency = np.zeros(capacity, dtype=np.int32)
+        self.turns = np.zeros(capacity, dtype=np.int32)
+        self.atk = np.zeros(capacity, dtype=np.int64)  # Target id -> ATK from its effects
+        self.def_ = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def columns(self):
+        # The live rows of each column, (target, kind, potency, turns)
+        n = self.size
+        return self.target[:n], self.kind[:n], self.potency[:n], self.turns[:n]
+
+    def add(self, target, effect, potency, turns):
+        if self.size == len(self.target):
+            self._resize(2 * self.size)
+        code = EFFECT_CODES[effect]
+        n = self.size
+        self.target[n] = target
+        self.kind[n] = code
+        self.potency[n] = potency
+        self.turns[n] = turns
+        self.size += 1
+        self._reserve_targets(target + 1)
+        self.atk[target] += potency * ATK_RATE[code]
+        self.def_[target] += potency * DEF_RATE[code]
+
+    def has(self, target, effect):
+        target_col, kind, _, _ = self.columns()
+        return bool(np.any((target_col == target) & (kind == EFFECT_CODES[effect])))
+
+    def names(self, target):
+        # Names of the effects on one combatant, in table order
+        target_col, kind, _, _ = self.columns()
+        return [EFFECTS[code].value[0] for code in np.unique(kind[target_col == target])]
+
+    def atk_bonus(self, target):
+        return int(self.atk[target]) if target < len(self.atk) else 0
+
+    def def_bonus(self, target):
+        return int(self.def_[target]) if target < len(self.def_) else 0
+
+    def tick(self, alive):
+        """Run one turn of every effect; returns the HP change per target id
+
+        alive is a bool array indexed by target id. Effects on targets that
+        are gone are dropped, as are the ones that just ran out.
+        """
+        target, kind, potency, turns = self.columns()
+        live = alive[target]
+        hp = np.bincount(target[live], weights=(potency * HP_RATE[kind])[live],
+                         minlength=len(alive)).astype(np.int64)
+        turns[turns > 0] -= 1
+        keep = live & (turns != 0)
+        self.load(target[keep], kind[keep], potency[keep], turns[keep])
+        return hp
+
+    def load(self, target, kind, potency, turns):
+        # Replace every row, e.g. from a save, and recount the modifiers
+        size = len(target)
+        if size > len(self.target):
+            self._resize(size)
+        self.target[:size] = target
+        self.kind[:size] = kind
+        self.potency[:size] = potency
+        self.turns[:size] = turns
+        self.size = size
+        target, kind, potency, _ = self.columns()
+        length = max(len(self.atk), int(target.max()) + 1 if size else 0)
+        self.atk = np.bincount(target, weights=potency * ATK_RATE[kind], minlength=length).astype(np.int64)
+        self.def_ = np.bincount(target, weights=potency * DEF_RATE[kind], minlength=length).astype(np.int64)
+
+    def _resize(self, capacity):
+        capacity = max(capacity, 16)
+        for name in ('target', 'kind', 'potency', 'turns'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _reserve_targets(self, count):
+        if count > len(self.atk):
+            length = max(count, 2 * len(self.atk))
+            self.atk = np.concatenate((self.atk, np.zeros(length - len(self.atk), dtype=np.int64)))
+            self.def_ = np.concatenate((self.def_, np.zeros(length - len(self.def_), dtype=np.int64)))
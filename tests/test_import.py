@@ -0,0 +1,45 @@
+"""Importing dungeo must stay cheap and must not start any SDL subsystem.
+
+Each check runs in a fresh interpreter, so nothing imported by pytest or by
+other tests is already cached. pygame and numpy are imported first and not
+counted: the budget covers the game's own modules.
+"""
+import json
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 150  # About 20-50 ms measured; pygame itself takes ~0.3-0.5 s on top
+
+PROBE = '''
+import json, time
+import pygame, numpy
+start = time.perf_counter()
+import dungeo
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "display": bool(pygame.display.get_init()),
+    "mixer": bool(pygame.mixer.get_init()),
+}))
+'''
+
+
+def _probe():
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=REPO, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_starts_no_sdl_subsystems():
+    probe = _probe()
+    assert not probe['display']
+    assert not probe['mixer']
+
+
+def test_import_time_budget():
+    # Best of three, so a busy machine doesn't fail the build on one slow start
+    best = min(_probe()['ms'] for _ in range(3))
+    assert best < IMPORT_BUDGET_MS, f"import dungeo took {best:.0f} ms, budget {IMPORT_BUDGET_MS} ms"
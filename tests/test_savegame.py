@@ -0,0 +1,49 @@
+"""A damaged snapshot must fail with ValueError and leave the session alone.
+
+Game.quickload only catches ValueError (and OSError), so anything else
+escaping restore would crash the game on a bad quicksave.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import savegame
+from simulation import Simulation
+
+
+def _combat_session():
+    sim = Simulation(seed=7)
+    sim.start_game("WARRIOR", "Tester", seed=7)
+    sim.change_floor(1)
+    sim.change_floor(0)
+    sim.start_combat(5)
+    return sim
+
+
+def test_truncated_snapshot_leaves_session_unchanged():
+    sim = _combat_session()
+    data = savegame.dumps(sim)
+    for size in range(0, len(data), 7):
+        with pytest.raises(ValueError):
+            savegame.restore(sim, data[:size])
+        assert savegame.dumps(sim) == data
+
+
+def test_corrupt_snapshot_raises_value_error_or_restores():
+    sim = _combat_session()
+    data = savegame.dumps(sim)
+    rng = random.Random(1)
+    for _ in range(2000):
+        damaged = bytearray(data)
+        for _ in range(rng.randint(1, 4)):
+            damaged[rng.randrange(len(damaged))] ^= 1 << rng.randrange(8)
+        try:
+            savegame.restore(sim, bytes(damaged))
+        except ValueError:
+            assert savegame.dumps(sim) == data
+        else:
+            savegame.restore(sim, data)  # Harmless flip, e.g. in HP or a board flag
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+import pygame
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color, antialias)"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.rects = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def get_rect(self, font, text, **anchor):
+        # Rects only depend on the text size, so hit-testing never renders
+        key = (font, text, tuple(sorted(anchor.items())))
+        rect = self.rects.get(key)
+        if rect is None:
+            width, height = font.size(text)
+            rect = self._anchored_rect(width, height, anchor)
+            self.rects[key] = rect
+            if len(self.rects) > self.max_entries:
+                self.rects.popitem(last=False)
+        else:
+            self.rects.move_to_end(key)
+        # Hand out a copy so callers can't move the cached rect
+        return rect.copy()
+
+    @staticmethod
+    def _anchored_rect(width, height, anchor):
+        rect = pygame.Rect(0, 0, width, height)
+        for name, value in anchor.items():
+            setattr(rect, name, value)
+        return rect
+
+    def clear(self):
+        self.surfaces.clear()
+        self.rects.clear()